@@ -1,4 +1,12 @@
-from setuptools import setup, find_packages
+import sys
+
+from setuptools import setup, find_packages, Extension
+
+# Numbaを使えない環境向けの相関カーネル（Cython未インストール時はビルドしない）
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    cythonize = None
 
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
@@ -6,6 +14,24 @@ with open("README.md", "r", encoding="utf-8") as fh:
 with open("requirements.txt", "r", encoding="utf-8") as fh:
     requirements = [line.strip() for line in fh if line.strip() and not line.startswith("#")]
 
+ext_modules = []
+if cythonize is not None:
+    if sys.platform == "win32":
+        compile_args, link_args = ["/O2", "/openmp"], []
+    else:
+        compile_args, link_args = ["-O3", "-fopenmp"], ["-fopenmp"]
+    ext_modules = cythonize(
+        [
+            Extension(
+                "stock_pattern_matcher._rolling",
+                ["stock_pattern_matcher/_rolling.pyx"],
+                extra_compile_args=compile_args,
+                extra_link_args=link_args,
+            )
+        ],
+        compiler_directives={"language_level": 3},
+    )
+
 setup(
     name="stock-pattern-matcher",
     version="1.0.0",
@@ -21,6 +47,7 @@ setup(
         "Source Code": "https://github.com/yourusername/stock-pattern-matcher",
     },
     packages=find_packages(),
+    ext_modules=ext_modules,
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Financial and Insurance Industry",
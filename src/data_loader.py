@@ -4,37 +4,82 @@ Google DriveからJSONファイルを読み込み、pandas DataFrameに変換
 """
 
 import json
+import mmap
+import multiprocessing
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# 高速JSONパーサー（未インストール時は標準のjsonを使用）
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ストリーミングJSONパーサー（巨大ファイルを銘柄単位で処理）
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Polars（backend='polars' の場合のみ使用）
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# このサイズを超えるファイルはijsonでストリーミング処理する
+STREAMING_THRESHOLD_BYTES = 512 * 1024 * 1024
+
+# DataFrameを作成するために必須のキー
+REQUIRED_KEYS = ['Date', 'open', 'high', 'low', 'close']
 
 
 class StockDataLoader:
     """株価データ読み込みクラス"""
     
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, backend: str = 'pandas'):
         """
         Args:
             data_path: JSONファイルが格納されているフォルダパス
+            backend: 銘柄ごとのDataFrameの種類 ('pandas', 'polars')。
+                'polars' の場合は日付を 'date' カラムに持つpolars.DataFrameを返し、
+                pandasのDataFrame構築を省く（PatternMatcherはどちらも受け付ける）
         """
+        if backend not in ('pandas', 'polars'):
+            raise ValueError(f"Unknown backend: {backend}")
+        if backend == 'polars' and pl is None:
+            raise ImportError("polars is not installed")
+        
         self.data_path = Path(data_path)
+        self.backend = backend
         self.symbols_data: Dict[str, pd.DataFrame] = {}
         self.metadata: Dict[str, any] = {}
     
-    def load_all_data(self) -> Dict[str, pd.DataFrame]:
+    def load_all_data(self, max_workers: Optional[int] = None) -> Dict[str, pd.DataFrame]:
         """
         全てのJSONファイルを読み込み、銘柄ごとのDataFrameを返す
         
+        max_workers > 1 の場合は複数ファイルをProcessPoolExecutor（spawn）で並列にパースする。
+        子プロセスからはndarrayの辞書だけを受け取り、DataFrameは親プロセスで組み立てる。
+        spawnは呼び出し元スクリプトを再importするため、並列化する場合は
+        `if __name__ == '__main__':` の中から呼び出すこと
+        
+        Args:
+            max_workers: 並列プロセス数（Noneまたは1の場合は逐次読み込み）
+        
         Returns:
             銘柄コードをキー、DataFrameを値とする辞書
         """
         if not self.data_path.exists():
             raise FileNotFoundError(f"Data path not found: {self.data_path}")
         
-        # JSONファイルを取得
-        json_files = list(self.data_path.glob('*.json')) + list(self.data_path.glob('*'))
+        # JSONファイルを取得（'*.json' は '*' にも含まれるため重複を除く）
+        json_files = sorted(set(self.data_path.glob('*.json')) | set(self.data_path.glob('*')))
         json_files = [f for f in json_files if f.is_file() and not f.name.startswith('.')]
         
         if not json_files:
@@ -42,18 +87,28 @@ class StockDataLoader:
         
         print(f"📂 Found {len(json_files)} JSON files")
         
-        all_symbols = {}
-        total_records = 0
-        
-        for json_file in json_files:
+        parallel = len(json_files) > 1 and max_workers is not None and max_workers > 1
+        if parallel:
             try:
-                symbols = self._load_single_file(json_file)
-                all_symbols.update(symbols)
-                total_records += sum(len(df) for df in symbols.values())
-                
-            except Exception as e:
-                print(f"⚠️  Failed to load {json_file.name}: {e}")
-                continue
+                all_symbols, total_records = self._load_files_parallel(json_files, max_workers)
+            except BrokenProcessPool as e:
+                # 子プロセスが異常終了した場合（__main__ ガードのないスクリプトなど）は
+                # ファイル単位の失敗として握りつぶさず、全ファイルを逐次で読み直す
+                print(f"⚠️  Worker processes terminated abruptly ({e}), loading files serially")
+                parallel = False
+        
+        if not parallel:
+            all_symbols = {}
+            total_records = 0
+            for json_file in json_files:
+                try:
+                    symbols = self._load_single_file(json_file)
+                    all_symbols.update(symbols)
+                    total_records += sum(len(df) for df in symbols.values())
+                    
+                except Exception as e:
+                    print(f"⚠️  Failed to load {json_file.name}: {e}")
+                    continue
         
         self.symbols_data = all_symbols
         
@@ -69,6 +124,38 @@ class StockDataLoader:
         
         return all_symbols
     
+    def _load_files_parallel(self, json_files: List[Path], max_workers: int) -> Tuple[Dict[str, pd.DataFrame], int]:
+        """
+        JSONファイルを子プロセス（spawn）で並列にパース
+        
+        fork だとNumbaの並列カーネルが起動したスレッド層ごと複製され、終了時に固まるため spawn を使う
+        
+        Args:
+            json_files: 読み込むファイルのリスト
+            max_workers: 並列プロセス数
+            
+        Returns:
+            (銘柄ごとのDataFrameの辞書, 総レコード数)
+            
+        Raises:
+            BrokenProcessPool: 子プロセスが異常終了した場合
+        """
+        all_symbols = {}
+        total_records = 0
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [executor.submit(_load_single_file_worker, f) for f in json_files]
+            for json_file, future in zip(json_files, futures):
+                try:
+                    symbols = self._build_dataframes(*future.result())
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    print(f"⚠️  Failed to load {json_file.name}: {e}")
+                    continue
+                all_symbols.update(symbols)
+                total_records += sum(len(df) for df in symbols.values())
+        return all_symbols, total_records
+    
     def _load_single_file(self, json_file: Path) -> Dict[str, pd.DataFrame]:
         """
         単一のJSONファイルを読み込み
@@ -86,22 +173,31 @@ class StockDataLoader:
         Returns:
             銘柄コードをキー、DataFrameを値とする辞書
         """
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        return self._build_dataframes(*_load_single_file_worker(json_file))
+    
+    def _build_dataframes(
+        self,
+        symbol_arrays: Dict[str, Dict[str, np.ndarray]],
+        errors: List[str]
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        _load_single_file_worker の結果から銘柄ごとのDataFrameを組み立てる
+        
+        Args:
+            symbol_arrays: 銘柄コードをキー、カラム名 -> ndarray の辞書を値とする辞書
+            errors: ワーカー側で発生した銘柄単位のエラーメッセージ
+            
+        Returns:
+            銘柄コードをキー、DataFrameを値とする辞書
+        """
+        for message in errors:
+            print(message)
         
         symbols = {}
         
-        for symbol_code, symbol_data in data.items():
-            if not isinstance(symbol_data, dict):
-                continue
-            
-            # 必須カラムの確認
-            required_cols = ['Date', 'open', 'high', 'low', 'close']
-            if not all(col in symbol_data for col in required_cols):
-                continue
-            
+        for symbol_code, arrays in symbol_arrays.items():
             try:
-                df = self._create_dataframe(symbol_code, symbol_data)
+                df = self._create_dataframe(symbol_code, arrays)
                 if len(df) > 0:
                     symbols[symbol_code] = df
                     
@@ -111,44 +207,169 @@ class StockDataLoader:
         
         return symbols
     
-    def _create_dataframe(self, symbol_code: str, symbol_data: Dict) -> pd.DataFrame:
+    @staticmethod
+    def _iter_symbols(json_file: Path) -> Iterator[Tuple[str, Dict]]:
+        """
+        JSONファイルから (銘柄コード, 銘柄データ) を順に取り出す
+        
+        巨大なファイルはijsonで1銘柄ずつストリーミングし、ファイル全体を
+        メモリに展開しない。それ以外はmmap + orjson（なければjson）で一括パースする
+        
+        Args:
+            json_file: JSONファイルのパス
+            
+        Yields:
+            (銘柄コード, 銘柄の生データ) のタプル
+        """
+        if ijson is not None and json_file.stat().st_size > STREAMING_THRESHOLD_BYTES:
+            with open(json_file, 'rb') as f:
+                yield from ijson.kvitems(f, '', use_float=True)
+            return
+        
+        if orjson is not None:
+            # mmapしたページをそのままパーサーに渡し、read()によるバイト列のコピーを省く
+            with open(json_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                with memoryview(mm) as view:
+                    data = orjson.loads(view)
+        else:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        
+        yield from data.items()
+    
+    @staticmethod
+    def _to_float_array(values, dtype=np.float64) -> np.ndarray:
+        """
+        数値リストをfloat配列に変換（変換できない要素を含む場合のみpd.to_numericを使用）
+        
+        Args:
+            values: 数値のリスト
+            dtype: 変換後のdtype
+            
+        Returns:
+            dtypeのndarray（変換できない要素はNaN）
+        """
+        try:
+            return np.asarray(values, dtype=dtype)
+        except (ValueError, TypeError):
+            return pd.to_numeric(values, errors='coerce').astype(dtype)
+    
+    @staticmethod
+    def _to_datetime_array(values) -> np.ndarray:
+        """
+        日付リストをdatetime64配列に変換（ISO形式以外を含む場合のみpd.to_datetimeを使用）
+        
+        Args:
+            values: 日付文字列のリスト
+            
+        Returns:
+            datetime64[ns]のndarray（変換できない要素はNaT）
+        """
+        try:
+            return np.asarray(values, dtype='datetime64[ns]')
+        except (ValueError, TypeError):
+            return pd.to_datetime(values, errors='coerce').to_numpy(dtype='datetime64[ns]')
+    
+    @staticmethod
+    def _parse_symbol_data(symbol_data: Dict) -> Dict[str, np.ndarray]:
+        """
+        銘柄の生データを数値・日付のndarrayに変換
+        
+        Args:
+            symbol_data: 銘柄の生データ
+            
+        Returns:
+            カラム名をキー、ndarrayを値とする辞書
+        """
+        n_rows = len(symbol_data['Date'])
+        # 価格は有効桁数6〜7桁で十分なのでfloat32で保持し、後段のスイープのメモリ帯域を半減させる
+        # 出来高は桁が大きくなり得るためfloat64のまま
+        return {
+            'date': StockDataLoader._to_datetime_array(symbol_data['Date']),
+            'open': StockDataLoader._to_float_array(symbol_data['open'], np.float32),
+            'high': StockDataLoader._to_float_array(symbol_data['high'], np.float32),
+            'low': StockDataLoader._to_float_array(symbol_data['low'], np.float32),
+            'close': StockDataLoader._to_float_array(symbol_data['close'], np.float32),
+            'volume': StockDataLoader._to_float_array(symbol_data.get('volume', np.zeros(n_rows)))
+        }
+    
+    def _create_dataframe(self, symbol_code: str, arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
         """
         銘柄データからDataFrameを作成
         
+        欠損行の除外はndarray上のマスク1回で行い、DataFrameは1度だけ構築する
+        
         Args:
             symbol_code: 銘柄コード
-            symbol_data: 銘柄の生データ
+            arrays: _parse_symbol_data で変換済みの銘柄データ
             
         Returns:
             整形されたDataFrame
         """
-        # DataFrameを作成
-        df = pd.DataFrame({
-            'date': symbol_data['Date'],
-            'open': pd.to_numeric(symbol_data['open'], errors='coerce'),
-            'high': pd.to_numeric(symbol_data['high'], errors='coerce'),
-            'low': pd.to_numeric(symbol_data['low'], errors='coerce'),
-            'close': pd.to_numeric(symbol_data['close'], errors='coerce'),
-            'volume': pd.to_numeric(
-                symbol_data.get('volume', [0] * len(symbol_data['Date'])), 
-                errors='coerce'
-            )
-        })
+        ohlc_cols = ['open', 'high', 'low', 'close']
+        
+        # 日付・OHLCが欠損している行を除外
+        valid = ~np.isnat(arrays['date'])
+        for col in ohlc_cols:
+            valid &= ~np.isnan(arrays[col])
+        
+        if self.backend == 'polars':
+            return self._create_polars_dataframe(symbol_code, arrays, valid)
         
-        # 日付をDatetimeIndexに変換
-        df['date'] = pd.to_datetime(df['date'], errors='coerce')
-        df = df.dropna(subset=['date'])
-        df = df.set_index('date')
-        df = df.sort_index()
+        df = pd.DataFrame(
+            {col: arrays[col][valid] for col in ohlc_cols + ['volume']},
+            index=pd.DatetimeIndex(arrays['date'][valid], name='date'),
+            copy=False
+        )
         
-        # NaNを除外
-        df = df.dropna(subset=['open', 'high', 'low', 'close'])
+        # データ提供元の多くは日付順なので、未ソートの場合のみソート
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
         
-        # 銘柄コードを追加
-        df['symbol'] = symbol_code
+        # 銘柄コードを追加（全行同じ値なのでカテゴリ型で1バイト/行に抑える）
+        df['symbol'] = pd.Categorical.from_codes(
+            np.zeros(len(df), dtype=np.int8), categories=[symbol_code]
+        )
         
         return df
     
+    @staticmethod
+    def _create_polars_dataframe(
+        symbol_code: str,
+        arrays: Dict[str, np.ndarray],
+        valid: np.ndarray
+    ) -> 'pl.DataFrame':
+        """
+        マスク済みのndarrayからpolars.DataFrameを作成
+        
+        カラムはArrowの配列としてそのまま保持されるため、pandasのBlockManagerへの
+        統合コピーが発生せず、to_numpy() もコピーなしのビューを返せる
+        
+        Args:
+            symbol_code: 銘柄コード
+            arrays: _parse_symbol_data で変換済みの銘柄データ
+            valid: 有効な行のマスク
+            
+        Returns:
+            整形されたpolars.DataFrame
+        """
+        df = pl.DataFrame({
+            col: arrays[col][valid] for col in ['date', 'open', 'high', 'low', 'close', 'volume']
+        })
+        
+        # データ提供元の多くは日付順なので、未ソートの場合のみソート
+        if not df['date'].is_sorted():
+            df = df.sort('date')
+        
+        return df.with_columns(pl.lit(symbol_code).cast(pl.Categorical).alias('symbol'))
+    
+    @staticmethod
+    def _dates(df):
+        """DataFrameの日付列を取得（pandasはインデックス、Polarsは 'date' カラム）"""
+        return df.index if isinstance(df, pd.DataFrame) else df['date']
+    
     def get_symbol_data(self, symbol_code: str) -> Optional[pd.DataFrame]:
         """
         特定の銘柄のデータを取得
@@ -174,11 +395,13 @@ class StockDataLoader:
         if symbol_code:
             df = self.get_symbol_data(symbol_code)
             if df is not None:
-                return df.index.min(), df.index.max()
+                dates = self._dates(df)
+                return dates.min(), dates.max()
         else:
             all_dates = []
             for df in self.symbols_data.values():
-                all_dates.extend([df.index.min(), df.index.max()])
+                dates = self._dates(df)
+                all_dates.extend([dates.min(), dates.max()])
             if all_dates:
                 return min(all_dates), max(all_dates)
         
@@ -194,12 +417,13 @@ class StockDataLoader:
         summary_data = []
         
         for symbol, df in self.symbols_data.items():
+            dates = self._dates(df)
             summary_data.append({
                 'symbol': symbol,
                 'records': len(df),
-                'start_date': df.index.min(),
-                'end_date': df.index.max(),
-                'latest_close': df['close'].iloc[-1] if len(df) > 0 else None,
+                'start_date': dates.min(),
+                'end_date': dates.max(),
+                'latest_close': df['close'].to_numpy()[-1] if len(df) > 0 else None,
                 'avg_volume': df['volume'].mean()
             })
         
@@ -226,4 +450,36 @@ class StockDataLoader:
         return len(self.symbols_data)
     
     def __repr__(self) -> str:
-        return f"StockDataLoader(symbols={len(self.symbols_data)}, path={self.data_path})"
+        return f"StockDataLoader(symbols={len(self.symbols_data)}, path={self.data_path}, backend={self.backend})"
+
+
+def _load_single_file_worker(json_file: Path) -> Tuple[Dict[str, Dict[str, np.ndarray]], List[str]]:
+    """
+    単一のJSONファイルをパースし、銘柄ごとのndarray辞書を返す（ProcessPoolExecutor用）
+    
+    DataFrameはプロセス間のpickleが重いため、ここではndarrayまでの変換に留める
+    
+    Args:
+        json_file: JSONファイルのパス
+        
+    Returns:
+        (銘柄コード -> カラム名 -> ndarray の辞書, 銘柄単位のエラーメッセージ) のタプル
+    """
+    symbol_arrays = {}
+    errors = []
+    
+    for symbol_code, symbol_data in StockDataLoader._iter_symbols(json_file):
+        if not isinstance(symbol_data, dict):
+            continue
+        
+        # 必須カラムの確認
+        if not all(col in symbol_data for col in REQUIRED_KEYS):
+            continue
+        
+        try:
+            symbol_arrays[symbol_code] = StockDataLoader._parse_symbol_data(symbol_data)
+        except Exception as e:
+            errors.append(f"⚠️  Failed to process symbol {symbol_code}: {e}")
+            continue
+    
+    return symbol_arrays, errors
@@ -0,0 +1,24 @@
+"""
+NumbaカーネルのAOTコンパイルスクリプト
+src/ 以下に拡張モジュール pattern_kernels を生成する
+
+使い方:
+    python -m src.pattern_kernels_aot
+"""
+
+import os
+
+from numba.pycc import CC
+
+from .pattern_matcher_cpu_numba import AOT_SWEEP_SIGNATURE, minmax_corr_sweep
+
+cc = CC('pattern_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# AOTではparallelは使えないため、prangeは通常のループとしてコンパイルされる
+cc.export('minmax_corr_sweep', AOT_SWEEP_SIGNATURE)(minmax_corr_sweep)
+
+
+if __name__ == '__main__':
+    cc.compile()
+    print(f"✅ Compiled {cc.name} into {cc.output_dir}")
@@ -0,0 +1,168 @@
+"""
+Numba対応パターンマッチングモジュール
+スライディングウィンドウの正規化と相関計算をCPU上の1つのカーネルで実行
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# Numbaはオプション（未インストール時はNumPy実装にフォールバック）
+try:
+    from numba import njit, prange, types
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# AOTコンパイル済みの拡張モジュール（python -m src.pattern_kernels_aot で生成）。
+# Numba未インストールの環境でもこちらがあればカーネルを使える（シングルスレッド）
+try:
+    from .pattern_kernels import minmax_corr_sweep as _aot_sweep
+    AOT_AVAILABLE = True
+except ImportError:
+    _aot_sweep = None
+    AOT_AVAILABLE = False
+
+KERNEL_AVAILABLE = NUMBA_AVAILABLE or AOT_AVAILABLE
+
+# このウィンドウサイズ以下はwindow_sizeを定数化した特殊化カーネルを使う
+MAX_SPECIALIZED_WINDOW_SIZE = 64
+
+if NUMBA_AVAILABLE:
+    def _sweep_signature(layout):
+        """OHLCのメモリレイアウトを指定したスイープカーネルのシグネチャ"""
+        return types.float32[::1](
+            types.Array(types.float32, 2, layout, readonly=True),
+            types.Array(types.float32, 1, 'C', readonly=True),
+            types.int64
+        )
+
+    # 明示的なシグネチャ（import時にコンパイルし、初回呼び出し時のJITを避ける）。
+    # pandasが返す読み取り専用ビューも受け付けるようにOHLCはreadonlyで宣言する。
+    # 'A' レイアウトだけを用意し、F-order・C-order・それ以外のビューをすべてこれで受ける
+    # （'C'/'F' を並べると 'A' と重なり、連続配列で Ambiguous overloading になる）
+    SWEEP_SIGNATURES = [_sweep_signature('A')]
+
+    # AOTコンパイルで公開するシグネチャ（呼び出し側でC-orderに揃えてから渡す）
+    AOT_SWEEP_SIGNATURE = _sweep_signature('C')
+
+    def _make_minmax_corr_sweep(fixed_window_size):
+        """
+        スイープカーネルのPython関数を生成
+
+        fixed_window_size > 0 の場合はその値をクロージャ定数として埋め込み、
+        引数のwindow_sizeを無視する。Numbaはクロージャ変数をコンパイル時定数として扱うため、
+        ウィンドウ内のループ長が固定されて展開される
+
+        Args:
+            fixed_window_size: 埋め込むウィンドウサイズ（0の場合は引数の値を使う）
+
+        Returns:
+            minmax_corr_sweep(ohlc, target_flat, window_size) 関数
+        """
+        def minmax_corr_sweep(ohlc, target_flat, window_size):
+            """
+            全ウィンドウをMin-Max正規化し、ターゲットとの相関係数を計算
+
+            Args:
+                ohlc: OHLC配列 (N, 4), float32
+                target_flat: 正規化済みターゲットを平坦化した配列 (window_size * 4,), float32
+                window_size: ウィンドウサイズ
+
+            Returns:
+                類似度スコアの配列 (N - window_size + 1,), float32
+            """
+            if fixed_window_size > 0:
+                window_size = fixed_window_size
+            n_channels = ohlc.shape[1]
+            n_windows = ohlc.shape[0] - window_size + 1
+            size = window_size * n_channels
+            sims = np.empty(n_windows, dtype=np.float32)
+
+            # ターゲット側の中心化は1回だけ
+            t_centered = target_flat - target_flat.mean()
+            t_ss = np.float32(0.0)
+            for j in range(size):
+                t_ss += t_centered[j] * t_centered[j]
+
+            for i in prange(n_windows):
+                buf = np.empty(size, dtype=np.float32)
+
+                # チャネルごとのMin-Max正規化
+                # min/maxは分岐なしのminps/maxps命令に落ちる（if文の比較はベクトル化を妨げる）
+                for c in range(n_channels):
+                    mn = ohlc[i, c]
+                    mx = mn
+                    for k in range(1, window_size):
+                        v = ohlc[i + k, c]
+                        mn = min(mn, v)
+                        mx = max(mx, v)
+                    scale = np.float32(1.0) / (mx - mn + np.float32(1e-8))
+                    for k in range(window_size):
+                        buf[k * n_channels + c] = (ohlc[i + k, c] - mn) * scale
+
+                # 中心化した内積で相関係数
+                mean = buf.sum() / size
+                numerator = np.float32(0.0)
+                w_ss = np.float32(0.0)
+                for j in range(size):
+                    d = buf[j] - mean
+                    numerator += d * t_centered[j]
+                    w_ss += d * d
+                sims[i] = numerator / (np.sqrt(w_ss * t_ss) + np.float32(1e-8))
+
+            return sims
+
+        return minmax_corr_sweep
+
+    minmax_corr_sweep = _make_minmax_corr_sweep(0)
+
+    sweep = njit(SWEEP_SIGNATURES, parallel=True, fastmath=True, cache=True)(minmax_corr_sweep)
+
+    @lru_cache(maxsize=None)
+    def specialized_sweep(window_size: int):
+        """
+        window_sizeを定数として埋め込んだスイープカーネルを取得（ウィンドウサイズごとにキャッシュ）
+
+        sweep と同じ明示的なシグネチャで生成時にコンパイルし、初回呼び出し時のJITを避ける。
+        cache=Trueのキャッシュはクロージャ変数の値ごとに区別されるため、
+        2回目以降のプロセスではディスクから読み込まれる
+        """
+        return njit(SWEEP_SIGNATURES, parallel=True, fastmath=True, cache=True)(
+            _make_minmax_corr_sweep(window_size)
+        )
+
+    # 既定のウィンドウサイズ（PatternMatcherGPU の window_size=20）はimport時に用意しておく
+    DEFAULT_WINDOW_SIZE = 20
+    specialized_sweep(DEFAULT_WINDOW_SIZE)
+
+
+def correlation_sweep(ohlc: np.ndarray, target_normalized: np.ndarray, window_size: int) -> np.ndarray:
+    """
+    Numbaカーネルで全ウィンドウの相関係数を計算
+
+    Args:
+        ohlc: OHLC配列 (N, 4)。C/Fどちらのメモリ順でもよい
+        target_normalized: Min-Max正規化済みターゲットパターン (window_size, 4)
+        window_size: ウィンドウサイズ
+
+    Returns:
+        類似度スコアの配列 (N - window_size + 1,)
+    """
+    if not KERNEL_AVAILABLE:
+        raise RuntimeError("Numba is not installed")
+
+    target_flat = np.ascontiguousarray(target_normalized, dtype=np.float32).reshape(-1)
+
+    if not NUMBA_AVAILABLE:
+        return _aot_sweep(np.ascontiguousarray(ohlc, dtype=np.float32), target_flat, window_size)
+
+    # DataFrame.to_numpy() が返すF-orderのビューはチャネルごとに連続しているので、
+    # C-orderへのコピーはせずそのままカーネルに渡す
+    ohlc = np.asarray(ohlc, dtype=np.float32)
+
+    # 小さいウィンドウはループを展開できる特殊化版を使う
+    # （大きいウィンドウでは展開の効果が薄く、コンパイル時間だけが増える）
+    if window_size <= MAX_SPECIALIZED_WINDOW_SIZE:
+        return specialized_sweep(window_size)(ohlc, target_flat, window_size)
+    return sweep(ohlc, target_flat, window_size)
@@ -0,0 +1,169 @@
+"""
+CUDAカーネルモジュール
+Min-Max正規化と相関計算を1つのCuPy RawKernelに融合して実行
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    import cupy as cp
+    GPU_AVAILABLE = cp.cuda.is_available()
+except ImportError:
+    GPU_AVAILABLE = False
+    cp = None
+
+
+# 1ブロック = 1ウィンドウ、1スレッド = ウィンドウ内の1行（OHLCの4チャネル）
+# 中間結果はグローバルメモリに書き出さず、共有メモリ上のリダクションだけで完結させる
+# WINDOW_SIZE と BLOCK_SIZE はウィンドウサイズごとに #define で埋め込み、
+# リダクションのループ長をコンパイル時定数にして展開させる
+_MINMAX_CORR_SOURCE = r'''
+#define N_CHANNELS 4
+
+__device__ void block_reduce(float* red, int t, int n, int op)
+{
+    // op: 0 = min, 1 = max, 2 = sum（N_CHANNELS本のバッファを同時にリダクション）
+    for (int s = n / 2; s > 0; s >>= 1) {
+        if (t < s) {
+            for (int c = 0; c < N_CHANNELS; ++c) {
+                float a = red[c * n + t];
+                float b = red[c * n + t + s];
+                red[c * n + t] = (op == 0) ? fminf(a, b) : (op == 1) ? fmaxf(a, b) : a + b;
+            }
+        }
+        __syncthreads();
+    }
+}
+
+extern "C" __global__
+void minmax_corr_sweep(
+    const float* ohlc,
+    const float* target_centered,
+    const float* target_ss,
+    const int n_windows,
+    float* sims
+)
+{
+    extern __shared__ float red[];
+    const int w = blockIdx.x;
+    const int t = threadIdx.x;
+    const int n = BLOCK_SIZE;
+    if (w >= n_windows) return;
+
+    const bool active = t < WINDOW_SIZE;
+    float v[N_CHANNELS], mn[N_CHANNELS], mx[N_CHANNELS];
+
+    for (int c = 0; c < N_CHANNELS; ++c) {
+        v[c] = active ? ohlc[(size_t)(w + t) * N_CHANNELS + c] : 0.0f;
+    }
+
+    // チャネルごとの最小値
+    for (int c = 0; c < N_CHANNELS; ++c) red[c * n + t] = active ? v[c] : 3.402823466e+38f;
+    __syncthreads();
+    block_reduce(red, t, n, 0);
+    for (int c = 0; c < N_CHANNELS; ++c) mn[c] = red[c * n];
+    __syncthreads();
+
+    // チャネルごとの最大値
+    for (int c = 0; c < N_CHANNELS; ++c) red[c * n + t] = active ? v[c] : -3.402823466e+38f;
+    __syncthreads();
+    block_reduce(red, t, n, 1);
+    for (int c = 0; c < N_CHANNELS; ++c) mx[c] = red[c * n];
+    __syncthreads();
+
+    // レジスタ上で正規化し、ウィンドウ全体の平均を求める
+    float local_sum = 0.0f;
+    for (int c = 0; c < N_CHANNELS; ++c) {
+        v[c] = active ? (v[c] - mn[c]) / (mx[c] - mn[c] + 1e-8f) : 0.0f;
+        local_sum += v[c];
+    }
+    for (int c = 0; c < N_CHANNELS; ++c) red[c * n + t] = (c == 0) ? local_sum : 0.0f;
+    __syncthreads();
+    block_reduce(red, t, n, 2);
+    const float mean = red[0] / (float)(WINDOW_SIZE * N_CHANNELS);
+    __syncthreads();
+
+    // 中心化した内積と二乗和
+    float local_dot = 0.0f, local_ss = 0.0f;
+    if (active) {
+        for (int c = 0; c < N_CHANNELS; ++c) {
+            float d = v[c] - mean;
+            local_dot += d * target_centered[t * N_CHANNELS + c];
+            local_ss += d * d;
+        }
+    }
+    for (int c = 0; c < N_CHANNELS; ++c) {
+        red[c * n + t] = (c == 0) ? local_dot : (c == 1) ? local_ss : 0.0f;
+    }
+    __syncthreads();
+    block_reduce(red, t, n, 2);
+
+    if (t == 0) {
+        sims[w] = red[0] / (sqrtf(red[n] * target_ss[0]) + 1e-8f);
+    }
+}
+'''
+
+# 1ブロックのスレッド数上限（これを超えるウィンドウサイズは通常のCuPy演算で処理）
+MAX_FUSED_WINDOW_SIZE = 1024
+
+
+def _block_size(window_size: int) -> int:
+    """ウィンドウサイズ以上の2の冪（ツリーリダクション用）"""
+    return max(32, 1 << (window_size - 1).bit_length())
+
+
+@lru_cache(maxsize=None)
+def _minmax_corr_kernel(window_size: int) -> 'cp.RawKernel':
+    """
+    ウィンドウサイズを定数として埋め込んだ融合カーネルを取得（ウィンドウサイズごとにキャッシュ）
+
+    Args:
+        window_size: ウィンドウサイズ
+
+    Returns:
+        minmax_corr_sweep のRawKernel
+    """
+    defines = f"#define WINDOW_SIZE {window_size}\n#define BLOCK_SIZE {_block_size(window_size)}\n"
+    return cp.RawKernel(defines + _MINMAX_CORR_SOURCE, 'minmax_corr_sweep')
+
+
+def correlation_sweep_gpu(
+    ohlc: 'cp.ndarray',
+    target_normalized: 'cp.ndarray',
+    window_size: int,
+    n_windows: int
+) -> 'cp.ndarray':
+    """
+    融合カーネルで全ウィンドウの相関係数をGPU上で計算
+
+    Args:
+        ohlc: デバイス上のOHLC配列 (N, 4)
+        target_normalized: Min-Max正規化済みターゲットパターン (window_size, 4)
+        window_size: ウィンドウサイズ
+        n_windows: 計算するウィンドウ数
+
+    Returns:
+        デバイス上の類似度スコア配列 (n_windows,), float32
+    """
+    if not GPU_AVAILABLE:
+        raise RuntimeError("CUDA GPU is not available")
+    if window_size > MAX_FUSED_WINDOW_SIZE:
+        raise ValueError(f"window_size must be <= {MAX_FUSED_WINDOW_SIZE}: {window_size}")
+
+    ohlc = cp.ascontiguousarray(ohlc, dtype=cp.float32)
+    target_flat = cp.ascontiguousarray(target_normalized, dtype=cp.float32).reshape(-1)
+    target_centered = target_flat - target_flat.mean()
+    target_ss = cp.sum(target_centered ** 2, keepdims=True)
+    sims = cp.empty(n_windows, dtype=cp.float32)
+
+    threads = _block_size(window_size)
+    _minmax_corr_kernel(window_size)(
+        (n_windows,),
+        (threads,),
+        (ohlc, target_centered, target_ss, np.int32(n_windows), sims),
+        shared_mem=4 * threads * np.dtype(np.float32).itemsize
+    )
+    return sims
@@ -5,7 +5,7 @@ CuPyを使用してGPUで高速に計算
 
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Tuple, Union
 from datetime import datetime
 
 # GPU/CPU切り替え
@@ -16,6 +16,12 @@ except ImportError:
     GPU_AVAILABLE = False
     cp = None
 
+from .pattern_matcher_cpu_numba import AOT_AVAILABLE, KERNEL_AVAILABLE, NUMBA_AVAILABLE, correlation_sweep
+from .pattern_matcher_cuda import MAX_FUSED_WINDOW_SIZE, correlation_sweep_gpu
+
+# 銘柄横断検索で1回の行列積が生成する類似度行列の最大要素数（float32で256MB）
+CROSS_SYMBOL_BATCH_ELEMENTS = 2 ** 26
+
 
 class PatternMatcher:
     """GPU対応パターンマッチャー"""
@@ -28,7 +34,9 @@ class PatternMatcher:
         min_similarity: float = 0.7,
         method: str = 'correlation',
         use_gpu: bool = True,
-        normalize_method: str = 'minmax'
+        normalize_method: str = 'minmax',
+        cache_windows: bool = False,
+        half_precision: bool = False
     ):
         """
         Args:
@@ -39,6 +47,10 @@ class PatternMatcher:
             method: 類似度計算方法 ('correlation', 'euclidean', 'weighted')
             use_gpu: GPU使用フラグ
             normalize_method: 正規化方法 ('minmax', 'zscore', 'robust')
+            cache_windows: 銘柄ごとに正規化済みウィンドウをキャッシュするか
+                （同じ銘柄を複数のターゲットで検索する場合に有効）
+            half_precision: キャッシュする正規化済みウィンドウをfloat16で保持するか
+                （GPU時のみ有効。メモリ帯域とキャッシュ容量が半分になる）
         """
         self.window_size = window_size
         self.lookahead = lookahead
@@ -46,6 +58,11 @@ class PatternMatcher:
         self.min_similarity = min_similarity
         self.method = method
         self.normalize_method = normalize_method
+        self.cache_windows = cache_windows
+        self.half_precision = half_precision
+        
+        # 銘柄コード -> (キャッシュキー, 正規化済みウィンドウ (N, window_size, 4))
+        self._win_cache: Dict[str, Tuple[tuple, np.ndarray]] = {}
         
         # GPU使用の決定
         self.use_gpu = use_gpu and GPU_AVAILABLE
@@ -55,6 +72,10 @@ class PatternMatcher:
             print("⚠️  GPU requested but not available. Using CPU instead.")
         elif self.use_gpu:
             print(f"✅ Using GPU: {cp.cuda.Device().name}")
+        elif NUMBA_AVAILABLE:
+            print("📊 Using CPU (Numba)")
+        elif AOT_AVAILABLE:
+            print("📊 Using CPU (Numba AOT)")
         else:
             print("📊 Using CPU")
     
@@ -62,28 +83,33 @@ class PatternMatcher:
         """
         パターンを正規化
         
+        単一パターン (window_size, 4) とウィンドウ群 (N, window_size, 4) の
+        どちらも受け付け、時間軸（axis=-2）に沿ってチャネルごとに正規化する
+        
         Args:
             pattern: 正規化するパターン
             
         Returns:
             正規化されたパターン
         """
+        xp = cp.get_array_module(pattern) if cp is not None else np
+        
         if self.normalize_method == 'minmax':
             # Min-Max正規化 [0, 1]
-            min_val = pattern.min(axis=0, keepdims=True)
-            max_val = pattern.max(axis=0, keepdims=True)
+            min_val = pattern.min(axis=-2, keepdims=True)
+            max_val = pattern.max(axis=-2, keepdims=True)
             return (pattern - min_val) / (max_val - min_val + 1e-8)
         
         elif self.normalize_method == 'zscore':
             # Z-score正規化
-            mean = pattern.mean(axis=0, keepdims=True)
-            std = pattern.std(axis=0, keepdims=True)
+            mean = pattern.mean(axis=-2, keepdims=True)
+            std = pattern.std(axis=-2, keepdims=True)
             return (pattern - mean) / (std + 1e-8)
         
         elif self.normalize_method == 'robust':
             # Robust正規化（中央値とIQR）
-            median = np.median(pattern, axis=0, keepdims=True)
-            q75, q25 = np.percentile(pattern, [75, 25], axis=0, keepdims=True)
+            # 3つの分位点を1回の呼び出しで求め、ウィンドウのソートを1回で済ませる
+            q25, median, q75 = xp.quantile(pattern, [0.25, 0.5, 0.75], axis=-2, keepdims=True)
             iqr = q75 - q25
             return (pattern - median) / (iqr + 1e-8)
         
@@ -104,60 +130,237 @@ class PatternMatcher:
         Returns:
             類似度スコア
         """
-        if self.use_gpu:
-            pattern1_gpu = self.xp.array(pattern1)
-            pattern2_gpu = self.xp.array(pattern2)
-            
-            if self.method == 'correlation':
-                # 相関係数
-                corr = self._correlation_gpu(pattern1_gpu, pattern2_gpu)
-                return float(corr.get())
+        pattern1 = self.xp.asarray(pattern1)
+        pattern2 = self.xp.asarray(pattern2)
+        
+        # バッチ版と同じ計算を1ウィンドウで実行し、ホストへの転送は最後の1回のみ
+        similarity = self._batch_similarity(pattern1, pattern2[None])[0]
+        return float(similarity)
+    
+    def _batch_similarity(self, target: np.ndarray, windows: np.ndarray) -> np.ndarray:
+        """
+        ターゲットと全ウィンドウの類似度をまとめて計算
+        
+        Args:
+            target: 正規化済みターゲットパターン (window_size, 4)
+            windows: 正規化済みウィンドウ群 (N, window_size, 4)
             
-            elif self.method == 'euclidean':
-                # ユークリッド距離（類似度に変換）
-                dist = self.xp.linalg.norm(pattern1_gpu - pattern2_gpu)
-                similarity = 1 / (1 + float(dist.get()))
-                return similarity
+        Returns:
+            類似度スコアの配列 (N,)
+        """
+        xp = self.xp
+        n_windows = windows.shape[0]
+        
+        if self.method == 'correlation':
+            # 各ウィンドウを1本のベクトルとみなして相関係数を計算
+            # t_centeredの総和は0なので w・t_centered == (w - mean)・t_centered となり、
+            # ウィンドウ側は中心化したコピーを作らずにGEMV 1回で分子が求まる
+            t_centered = target.reshape(-1) - target.mean()
+            w_flat = windows.reshape(n_windows, -1)
             
-            elif self.method == 'weighted':
-                # 加重類似度（最近のデータに重み）
-                weights = self.xp.linspace(0.5, 1.0, len(pattern1))
-                weighted_diff = self.xp.sum(weights[:, None] * (pattern1_gpu - pattern2_gpu) ** 2)
-                similarity = 1 / (1 + float(weighted_diff.get()))
-                return similarity
+            # float16のウィンドウはGEMVのみ半精度で行い、統計量はfloat32で集計
+            acc_dtype = xp.float32 if w_flat.dtype == xp.float16 else w_flat.dtype
+            numerator = (w_flat @ t_centered.astype(w_flat.dtype)).astype(acc_dtype)
+            w_mean = w_flat.mean(axis=1, dtype=acc_dtype)
+            w_ss = xp.sum(xp.square(w_flat, dtype=acc_dtype), axis=1) - w_flat.shape[1] * w_mean ** 2
+            denominator = xp.sqrt(xp.maximum(w_ss, 0) * xp.sum(t_centered ** 2))
+            return numerator / (denominator + 1e-8)
         
-        else:
-            # CPU実装
-            if self.method == 'correlation':
-                corr_matrix = np.corrcoef(pattern1.flatten(), pattern2.flatten())
-                return corr_matrix[0, 1]
+        elif self.method == 'euclidean':
+            dist = xp.sqrt(xp.sum((windows - target) ** 2, axis=(1, 2)))
+            return 1 / (1 + dist)
+        
+        elif self.method == 'weighted':
+            weights = xp.linspace(0.5, 1.0, target.shape[0])
+            weighted_diff = xp.sum(weights[:, None] * (windows - target) ** 2, axis=(1, 2))
+            return 1 / (1 + weighted_diff)
+        
+        return xp.zeros(n_windows)
+    
+    def _use_numba_sweep(self) -> bool:
+        """Numbaカーネル（Min-Max正規化 + 相関係数）が使えるかどうか"""
+        return (
+            not self.use_gpu
+            and KERNEL_AVAILABLE
+            and self.method == 'correlation'
+            and self.normalize_method == 'minmax'
+        )
+    
+    def _select_top_matches(self, similarities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        閾値を満たすウィンドウから上位top_n件を選択
+        
+        選択はデバイス上で行い、GPU時はtop_n件分のインデックスとスコアだけをホストへ転送する
+        
+        Args:
+            similarities: 全ウィンドウの類似度スコア (N,)
             
-            elif self.method == 'euclidean':
-                dist = np.linalg.norm(pattern1 - pattern2)
-                return 1 / (1 + dist)
+        Returns:
+            (ウィンドウインデックス, 類似度) のタプル（類似度の降順）
+        """
+        xp = self.xp
+        match_idx = xp.nonzero(similarities >= self.min_similarity)[0]
+        scores = similarities[match_idx]
+        if len(match_idx) > self.top_n:
+            keep = xp.argpartition(-scores, self.top_n)[:self.top_n]
+            match_idx, scores = match_idx[keep], scores[keep]
+        if self.use_gpu:
+            match_idx, scores = cp.asnumpy(match_idx), cp.asnumpy(scores)
+        
+        order = np.argsort(-scores, kind='stable')
+        return match_idx[order], scores[order]
+    
+    def _use_fused_gpu_kernel(self) -> bool:
+        """融合CUDAカーネル（Min-Max正規化 + 相関係数）が使えるかどうか"""
+        return (
+            self.use_gpu
+            and self.method == 'correlation'
+            and self.normalize_method == 'minmax'
+            and self.window_size <= MAX_FUSED_WINDOW_SIZE
+        )
+    
+    @staticmethod
+    def _ohlc_array(data, dtype=None) -> np.ndarray:
+        """
+        OHLCをホスト上の (N, 4) 配列として取得
+        
+        pandasとPolarsのどちらのDataFrameも受け付ける。Polarsは全カラムが同じ数値型なら
+        Arrowのバッファを共有したF-orderのビューをコピーなしで返す
+        
+        Args:
+            data: 株価データのDataFrame（pandas / Polars）
+            dtype: 変換後のdtype（Noneの場合は元データのまま）
             
-            elif self.method == 'weighted':
-                weights = np.linspace(0.5, 1.0, len(pattern1))
-                weighted_diff = np.sum(weights[:, None] * (pattern1 - pattern2) ** 2)
-                return 1 / (1 + weighted_diff)
+        Returns:
+            OHLC配列 (N, 4)
+        """
+        ohlc_cols = ['open', 'high', 'low', 'close']
+        if isinstance(data, pd.DataFrame):
+            return data[ohlc_cols].to_numpy(dtype=dtype)
+        ohlc = data.select(ohlc_cols).to_numpy()
+        return ohlc if dtype is None else ohlc.astype(dtype, copy=False)
+    
+    @staticmethod
+    def _date_array(data) -> np.ndarray:
+        """
+        日付をdatetime64配列として取得（pandasはインデックス、Polarsは 'date' カラム）
+        """
+        if isinstance(data, pd.DataFrame):
+            return data.index.to_numpy()
+        return data['date'].to_numpy()
+    
+    def _normalize_windows(self, data: pd.DataFrame, n_windows: int, dtype) -> np.ndarray:
+        """
+        先頭からn_windows個のウィンドウを切り出して正規化
         
-        return 0.0
+        Args:
+            data: 株価データのDataFrame
+            n_windows: ウィンドウ数
+            dtype: 計算に使うdtype
+            
+        Returns:
+            正規化済みウィンドウ群 (n_windows, window_size, 4)
+        """
+        ohlc = self.xp.asarray(self._ohlc_array(data, dtype))
+        windows = self.xp.lib.stride_tricks.sliding_window_view(
+            ohlc, (self.window_size, ohlc.shape[1])
+        )[:n_windows, 0]
+        return self.normalize_pattern(windows)
     
-    def _correlation_gpu(self, x: 'cp.ndarray', y: 'cp.ndarray') -> 'cp.ndarray':
-        """GPU上で相関係数を計算"""
-        x_flat = x.flatten()
-        y_flat = y.flatten()
+    def _zscore_correlation_from_window_stats(
+        self,
+        data: pd.DataFrame,
+        target_normalized: np.ndarray,
+        n_windows: int,
+        dtype
+    ) -> np.ndarray:
+        """
+        Z-score正規化 + 相関係数を、正規化済みウィンドウを作らずに計算
+        
+        Z-score正規化はチャネルごとのアフィン変換 x' = (x - mean) / std なので、
+        正規化後のウィンドウの和・二乗和は生データのウィンドウ和・二乗和（累積和の差分で O(N)）から、
+        ターゲットとの内積はチャネルごとの内積1回（GEMV相当）から求まる
+        
+        Args:
+            data: 株価データのDataFrame
+            target_normalized: 正規化済みターゲットパターン (window_size, 4)
+            n_windows: ウィンドウ数
+            dtype: 計算に使うdtype
+            
+        Returns:
+            類似度スコアの配列 (n_windows,)
+        """
+        xp = self.xp
+        ohlc_cols = ['open', 'high', 'low', 'close']
+        window_size = self.window_size
+        
+        # 累積和は桁落ちを避けるためfloat64で行い、正規化はシフト不変なので全体平均を引いておく
+        ohlc = xp.asarray(self._ohlc_array(data, dtype)[:n_windows + window_size - 1])
+        ohlc = ohlc.astype(xp.float64)
+        ohlc = ohlc - ohlc.mean(axis=0)
+        windows = xp.lib.stride_tricks.sliding_window_view(
+            ohlc, (window_size, len(ohlc_cols))
+        )[:, 0]
+        
+        # チャネルごとのウィンドウ和・二乗和
+        zeros = xp.zeros((1, len(ohlc_cols)))
+        csum = xp.concatenate([zeros, xp.cumsum(ohlc, axis=0)])
+        csum2 = xp.concatenate([zeros, xp.cumsum(ohlc ** 2, axis=0)])
+        sums = csum[window_size:] - csum[:-window_size]
+        sq_sums = csum2[window_size:] - csum2[:-window_size]
         
-        # 平均を引く
-        x_centered = x_flat - self.xp.mean(x_flat)
-        y_centered = y_flat - self.xp.mean(y_flat)
+        # Z-score正規化のパラメータ（np.std と同じく母標準偏差）
+        means = sums / window_size
+        variances = sq_sums / window_size - means ** 2
+        stds = xp.sqrt(xp.maximum(variances, 0))
         
-        # 相関係数
-        numerator = self.xp.sum(x_centered * y_centered)
-        denominator = self.xp.sqrt(self.xp.sum(x_centered ** 2) * self.xp.sum(y_centered ** 2))
+        # 累積和の丸め誤差以下の分散しかないチャネルは値幅なしとみなす
+        # （直接計算と同様に正規化後は0になり、誤差を1e8倍に増幅しない）
+        tolerance = 1e3 * np.finfo(np.float64).eps * csum2[-1] / window_size
+        scales = xp.where(variances <= tolerance, 0, 1 / (stds + 1e-8))
         
+        # 正規化後のウィンドウ全体の二乗偏差和
+        norm_sums = scales * (sums - window_size * means)
+        norm_sq_sums = scales ** 2 * (sq_sums - 2 * means * sums + window_size * means ** 2)
+        size = window_size * len(ohlc_cols)
+        w_ss = norm_sq_sums.sum(axis=1) - norm_sums.sum(axis=1) ** 2 / size
+        
+        # ターゲットは中心化済みなので、ウィンドウ側の平均を引かずに内積が求まる
+        t_centered = target_normalized.astype(xp.float64)
+        t_centered = t_centered - t_centered.mean()
+        cross = xp.einsum('nkc,kc->nc', windows, t_centered)
+        numerator = xp.sum(scales * (cross - means * t_centered.sum(axis=0)), axis=1)
+        denominator = xp.sqrt(xp.maximum(w_ss, 0) * xp.sum(t_centered ** 2))
         return numerator / (denominator + 1e-8)
     
+    def _cached_normalized_windows(
+        self,
+        data: pd.DataFrame,
+        symbol: str,
+        n_windows: int,
+        dtype
+    ) -> np.ndarray:
+        """
+        銘柄の正規化済みウィンドウをキャッシュから取得（なければ計算して保存）
+        
+        データ長・最終日付・パラメータが変わった場合は再計算する
+        """
+        cache_key = (len(data), self._date_array(data)[-1], self.window_size, self.lookahead, self.normalize_method)
+        cached = self._win_cache.get(symbol)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+        
+        windows_normalized = self._normalize_windows(data, n_windows, dtype)
+        if self.half_precision and self.use_gpu:
+            # 正規化後の値はスケールが揃っているため、float16に落としても精度は十分
+            windows_normalized = windows_normalized.astype(self.xp.float16)
+        self._win_cache[symbol] = (cache_key, windows_normalized)
+        return windows_normalized
+    
+    def clear_cache(self) -> None:
+        """正規化済みウィンドウのキャッシュを破棄"""
+        self._win_cache.clear()
+    
     def find_similar_patterns(
         self,
         data: pd.DataFrame,
@@ -167,61 +370,118 @@ class PatternMatcher:
         """
         類似パターンを検索
         
+        全ウィンドウを sliding_window_view で (N, window_size, 4) のビューとして取り出し、
+        正規化と類似度計算を一括で行う
+        
         Args:
-            data: 株価データのDataFrame
+            data: 株価データのDataFrame（pandas / Polars）
             target_pattern: 検索するターゲットパターン
             symbol: 銘柄コード（オプション）
             
         Returns:
             マッチ結果のリスト
         """
+        n_windows = len(data) - self.window_size - self.lookahead + 1
+        if n_windows <= 0:
+            return []
+        
+        # GPU時はfloat32で1回だけデバイスへ転送する
+        # CPU時は元データのdtype（StockDataLoaderはfloat32）をコピーせずそのまま使う
+        dtype = np.float32 if self.use_gpu else None
+        
         # ターゲットパターンを正規化
-        target_normalized = self.normalize_pattern(target_pattern)
+        target_normalized = self.normalize_pattern(self.xp.asarray(target_pattern, dtype=dtype))
         
-        results = []
-        ohlc_cols = ['open', 'high', 'low', 'close']
+        if self.cache_windows and symbol:
+            # キャッシュ済みの正規化ウィンドウに対して類似度計算のみ行う
+            windows_normalized = self._cached_normalized_windows(data, symbol, n_windows, dtype)
+            similarities = self._batch_similarity(target_normalized, windows_normalized)
+        elif self._use_numba_sweep():
+            # CPU: 正規化と相関計算を1つのNumbaカーネルで実行
+            ohlc = self._ohlc_array(data, np.float32)
+            similarities = correlation_sweep(
+                ohlc[:n_windows + self.window_size - 1], target_normalized, self.window_size
+            )
+        elif self._use_fused_gpu_kernel():
+            # GPU: 正規化と相関計算を1つのCUDAカーネルで実行
+            ohlc = self.xp.asarray(self._ohlc_array(data, dtype))
+            similarities = correlation_sweep_gpu(
+                ohlc, target_normalized, self.window_size, n_windows
+            )
+        elif self.method == 'correlation' and self.normalize_method == 'zscore':
+            # ウィンドウ統計量（累積和）から相関係数を直接計算
+            similarities = self._zscore_correlation_from_window_stats(
+                data, target_normalized, n_windows, dtype
+            )
+        else:
+            # 全ウィンドウを一括で正規化・類似度計算（スコアはデバイス上に保持）
+            windows_normalized = self._normalize_windows(data, n_windows, dtype)
+            similarities = self._batch_similarity(target_normalized, windows_normalized)
         
-        # スライディングウィンドウでパターンを抽出
-        for i in range(len(data) - self.window_size - self.lookahead + 1):
-            window_data = data.iloc[i:i + self.window_size][ohlc_cols].values
-            
-            # 正規化
-            window_normalized = self.normalize_pattern(window_data)
-            
-            # 類似度計算
-            similarity = self.calculate_similarity(target_normalized, window_normalized)
+        # 上位top_n件だけを O(N) で選択し、その中だけソート
+        match_idx, scores = self._select_top_matches(similarities)
+        
+        return self._build_results(data, symbol, match_idx, scores)
+    
+    def _build_results(
+        self,
+        data: pd.DataFrame,
+        symbol: Optional[str],
+        match_idx: np.ndarray,
+        scores: np.ndarray
+    ) -> List[Dict]:
+        """
+        マッチしたウィンドウ位置から結果の辞書リストを組み立てる
+        
+        Args:
+            data: マッチした銘柄の株価データ
+            symbol: 銘柄コード（Noneの場合はdataから取得）
+            match_idx: マッチしたウィンドウの開始位置
+            scores: 各マッチの類似度
             
-            if similarity >= self.min_similarity:
-                # 将来のリターンを計算
-                future_data = data.iloc[i + self.window_size:i + self.window_size + self.lookahead]
-                
-                if len(future_data) > 0:
-                    start_price = data.iloc[i + self.window_size - 1]['close']
-                    end_price = future_data['close'].iloc[-1]
-                    future_return = (end_price - start_price) / start_price
-                else:
-                    future_return = None
-                
-                results.append({
-                    'symbol': symbol if symbol else data['symbol'].iloc[0],
-                    'similarity': similarity,
-                    'start_date': data.index[i].strftime('%Y-%m-%d'),
-                    'end_date': data.index[i + self.window_size - 1].strftime('%Y-%m-%d'),
-                    'start_price': float(data.iloc[i]['close']),
-                    'end_price': float(data.iloc[i + self.window_size - 1]['close']),
-                    'future_return': float(future_return) if future_return is not None else None,
-                    'match_index': i
-                })
-        
-        # 類似度でソート
-        results.sort(key=lambda x: x['similarity'], reverse=True)
-        
-        return results[:self.top_n]
+        Returns:
+            マッチ結果のリスト
+        """
+        # 結果の組み立てはpandasを介さずndarrayのインデックス参照で行う
+        close = np.asarray(data['close'].to_numpy(), dtype=float)  # pandas / Polars 共通
+        end_idx = match_idx + self.window_size - 1
+        start_prices = close[match_idx]
+        end_prices = close[end_idx]
+        dates = self._date_array(data)
+        start_dates = np.datetime_as_string(dates[match_idx], unit='D')
+        end_dates = np.datetime_as_string(dates[end_idx], unit='D')
+        if not symbol:
+            symbol = data['symbol'].iloc[0] if isinstance(data, pd.DataFrame) else data['symbol'][0]
+        
+        # 将来のリターンを全マッチ分まとめて計算
+        if self.lookahead > 0:
+            future_returns = (close[end_idx + self.lookahead] - end_prices) / end_prices
+        else:
+            future_returns = [None] * len(match_idx)
+        
+        results = [
+            {
+                'symbol': symbol,
+                'similarity': float(similarity),
+                'start_date': start_date,
+                'end_date': end_date,
+                'start_price': float(start_price),
+                'end_price': float(end_price),
+                'future_return': float(future_return) if future_return is not None else None,
+                'match_index': int(i)
+            }
+            for i, similarity, start_date, end_date, start_price, end_price, future_return in zip(
+                match_idx, scores, start_dates, end_dates, start_prices, end_prices, future_returns
+            )
+        ]
+        
+        return results
     
     def analyze_all_symbols(
         self,
         symbols_data: Dict[str, pd.DataFrame],
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        cross_symbol: bool = False
     ) -> pd.DataFrame:
         """
         全銘柄のパターンマッチング分析
@@ -229,37 +489,173 @@ class PatternMatcher:
         Args:
             symbols_data: 銘柄データの辞書
             progress_callback: 進捗コールバック関数
+            cross_symbol: Trueの場合、各銘柄の最新パターンを自銘柄だけでなく
+                全銘柄の過去ウィンドウと照合する（結果に target_symbol 列が付く）
             
         Returns:
             結果のDataFrame
         """
+        if cross_symbol:
+            return self._analyze_cross_symbols(symbols_data, progress_callback)
+        
+        # データ不足・OHLC欠落の銘柄はループに入る前に1回だけ除外する
+        ohlc_cols = ['open', 'high', 'low', 'close']
+        min_length = self.window_size + self.lookahead
+        symbols_data = {
+            symbol: df for symbol, df in symbols_data.items()
+            if len(df) >= min_length and all(col in df.columns for col in ohlc_cols)
+        }
+        
         all_results = []
         total_symbols = len(symbols_data)
         
         print(f"🔍 Analyzing {total_symbols} symbols...")
         
         for idx, (symbol, df) in enumerate(symbols_data.items(), 1):
+            # 最新のパターンを抽出
+            target_pattern = self._ohlc_array(df)[-self.window_size:]
+            
+            # パターンマッチング（1銘柄の失敗で全体を止めないよう、銘柄単位でのみ捕捉する）
             try:
-                # データが十分にあるかチェック
-                if len(df) < self.window_size + self.lookahead:
-                    continue
-                
-                # 最新のパターンを抽出
-                target_pattern = df.iloc[-self.window_size:][['open', 'high', 'low', 'close']].values
-                
-                # パターンマッチング
                 results = self.find_similar_patterns(df, target_pattern, symbol)
-                all_results.extend(results)
-                
-                # 進捗表示
-                if progress_callback:
-                    progress_callback(idx, total_symbols, symbol)
-                elif idx % 10 == 0:
-                    print(f"  Progress: {idx}/{total_symbols} ({idx/total_symbols*100:.1f}%)")
-                
             except Exception as e:
                 print(f"⚠️  Error processing {symbol}: {e}")
                 continue
+            all_results.extend(results)
+            
+            # 進捗表示
+            if progress_callback:
+                progress_callback(idx, total_symbols, symbol)
+            elif idx % 10 == 0:
+                print(f"  Progress: {idx}/{total_symbols} ({idx/total_symbols*100:.1f}%)")
+        
+        if all_results:
+            results_df = pd.DataFrame(all_results)
+            results_df = results_df.sort_values('similarity', ascending=False)
+            print(f"✅ Found {len(results_df)} pattern matches")
+            return results_df
+        else:
+            print("❌ No pattern matches found")
+            return pd.DataFrame()
+    
+    def _gemm_operands(self, matrix, axis: int):
+        """
+        類似度をGEMM 1回で求められるように平坦化済みパターンを前処理する
+        
+        Args:
+            matrix: 平坦化した正規化済みパターン（axis方向が window_size*4）
+            axis: パターン要素の並ぶ軸
+            
+        Returns:
+            (前処理済み行列, 二乗ノルム)。correlationの場合、二乗ノルムはNone
+        """
+        xp = self.xp
+        
+        if self.method == 'correlation':
+            # 中心化して単位ノルムに揃えれば、内積がそのまま相関係数になる
+            centered = matrix - matrix.mean(axis=axis, keepdims=True)
+            norm = xp.sqrt(xp.sum(centered ** 2, axis=axis, keepdims=True))
+            return centered / (norm + 1e-8), None
+        
+        if self.method == 'weighted':
+            # 重み付き二乗距離は sqrt(重み) でスケールした行列の二乗距離に等しい
+            weights = xp.linspace(0.5, 1.0, self.window_size, dtype=matrix.dtype)
+            scale = xp.repeat(xp.sqrt(weights), 4)
+            matrix = matrix * (scale if axis == -1 else scale[:, None])
+        
+        return matrix, xp.sum(matrix ** 2, axis=axis)
+    
+    def _analyze_cross_symbols(
+        self,
+        symbols_data: Dict[str, pd.DataFrame],
+        progress_callback: Optional[callable] = None
+    ) -> pd.DataFrame:
+        """
+        全銘柄の最新パターンを全銘柄の過去ウィンドウと照合
+        
+        全銘柄の正規化済みウィンドウを (総ウィンドウ数, window_size*4) の行列に連結し、
+        全ターゲット (window_size*4, 銘柄数) との類似度を行列積でまとめて計算する。
+        類似度行列のサイズを抑えるため、ターゲットは CROSS_SYMBOL_BATCH_ELEMENTS に
+        収まる列数ずつ処理する
+        
+        Args:
+            symbols_data: 銘柄データの辞書
+            progress_callback: 進捗コールバック関数
+            
+        Returns:
+            結果のDataFrame
+        """
+        xp = self.xp
+        dtype = np.float32 if self.use_gpu else None
+        
+        print(f"🔍 Analyzing {len(symbols_data)} symbols (cross-symbol)...")
+        
+        # 1パス目: 銘柄ごとの正規化済みウィンドウと最新パターンを集める
+        symbols, blocks, targets = [], [], []
+        for symbol, df in symbols_data.items():
+            n_windows = len(df) - self.window_size - self.lookahead + 1
+            if n_windows <= 0:
+                continue
+            
+            if self.cache_windows:
+                windows = self._cached_normalized_windows(df, symbol, n_windows, dtype)
+            else:
+                windows = self._normalize_windows(df, n_windows, dtype)
+            target = xp.asarray(self._ohlc_array(df, dtype)[-self.window_size:])
+            
+            symbols.append(symbol)
+            blocks.append(windows.reshape(n_windows, -1))
+            targets.append(self.normalize_pattern(target).reshape(-1))
+        
+        if not symbols:
+            print("❌ No pattern matches found")
+            return pd.DataFrame()
+        
+        # float16キャッシュの場合も積和はターゲットと同じ精度で行う
+        target_matrix = xp.stack(targets, axis=1)
+        window_matrix = xp.concatenate(blocks).astype(target_matrix.dtype, copy=False)
+        offsets = np.cumsum([0] + [len(block) for block in blocks])
+        del blocks, targets
+        
+        window_matrix, window_sq = self._gemm_operands(window_matrix, axis=-1)
+        target_matrix, target_sq = self._gemm_operands(target_matrix, axis=0)
+        
+        all_results = []
+        total_symbols = len(symbols)
+        batch_size = max(1, CROSS_SYMBOL_BATCH_ELEMENTS // len(window_matrix))
+        
+        for start in range(0, total_symbols, batch_size):
+            stop = min(start + batch_size, total_symbols)
+            products = window_matrix @ target_matrix[:, start:stop]
+            
+            if self.method == 'correlation':
+                similarities = products
+            else:
+                sq_dist = xp.maximum(window_sq[:, None] + target_sq[None, start:stop] - 2 * products, 0)
+                if self.method == 'euclidean':
+                    similarities = 1 / (1 + xp.sqrt(sq_dist))
+                else:
+                    similarities = 1 / (1 + sq_dist)
+            
+            for j in range(start, stop):
+                match_idx, scores = self._select_top_matches(similarities[:, j - start])
+                
+                # 連結行列上の行番号を（銘柄, 銘柄内のウィンドウ位置）に戻す
+                owners = np.searchsorted(offsets, match_idx, side='right') - 1
+                for owner in np.unique(owners):
+                    mask = owners == owner
+                    matched = symbols[owner]
+                    results = self._build_results(
+                        symbols_data[matched], matched, match_idx[mask] - offsets[owner], scores[mask]
+                    )
+                    for result in results:
+                        result['target_symbol'] = symbols[j]
+                    all_results.extend(results)
+                
+                if progress_callback:
+                    progress_callback(j + 1, total_symbols, symbols[j])
+                elif (j + 1) % 10 == 0:
+                    print(f"  Progress: {j + 1}/{total_symbols} ({(j + 1)/total_symbols*100:.1f}%)")
         
         if all_results:
             results_df = pd.DataFrame(all_results)
@@ -280,5 +676,10 @@ class PatternMatcher:
             'method': self.method,
             'use_gpu': self.use_gpu,
             'gpu_available': GPU_AVAILABLE,
-            'normalize_method': self.normalize_method
+            'numba_available': NUMBA_AVAILABLE,
+            'aot_kernels_available': AOT_AVAILABLE,
+            'normalize_method': self.normalize_method,
+            'cache_windows': self.cache_windows,
+            'half_precision': self.half_precision,
+            'cached_symbols': len(self._win_cache)
         }
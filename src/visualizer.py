@@ -3,12 +3,22 @@
 Plotly（インタラクティブ）とMatplotlib（静的）でグラフを生成
 """
 
+import hashlib
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
-import plotly.graph_objects as go
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from datetime import datetime
 
+# plotlyのimportは重い（数百ms）ため、グラフを生成するメソッド内で遅延importする
+# （create_summary_stats だけを使う場合はplotlyを読み込まない）
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# メモリ上に保持する生成済みグラフの最大数（results_df 1件あたり最大5種類）
+FIG_CACHE_SIZE = 40
+
 
 class Visualizer:
     """グラフ生成クラス"""
@@ -18,16 +28,52 @@ class Visualizer:
         self.plotly_theme = config.get('visualization.plotly.theme', 'plotly_white')
         self.plotly_height = config.get('visualization.plotly.height', 600)
         self.plotly_width = config.get('visualization.plotly.width', 1000)
+        # 散布図に渡す最大点数（これを超える場合は類似度の上位だけを描画）
+        self.max_points = config.get('visualization.plotly.max_points', 2000)
+        
+        # (results_dfのハッシュ, グラフ種別) -> 生成済みグラフ（直近 FIG_CACHE_SIZE 件のLRU）
+        self._fig_cache: 'OrderedDict[Tuple[str, str], go.Figure]' = OrderedDict()
+        # 生成済みグラフをJSONで保存するフォルダ（Noneの場合はメモリ上のみ）
+        cache_dir = config.get('visualization.fig_cache_dir', None)
+        self.fig_cache_dir = Path(cache_dir) if cache_dir else None
+    
+    @staticmethod
+    def _histogram_bar(values, nbins: int = 50, **kwargs) -> 'go.Bar':
+        """
+        ヒストグラムをNumPyで集計し、ビン済みの棒グラフとして返す
+        
+        go.Histogramは全データをPlotly.js側に渡してブラウザで集計するため、
+        結果が数十万件を超えると描画が固まる。集計済みの件数だけを渡せば転送量はビン数に比例する
+        各棒のcustomdataにはビンの [下端, 上端] を持たせる（ホバー表示用）
+        """
+        import plotly.graph_objects as go
+        
+        # go.Histogramと同様に欠損値は集計から除外する
+        values = np.asarray(values, dtype=float)
+        counts, edges = np.histogram(values[np.isfinite(values)], bins=nbins)
+        return go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            customdata=np.column_stack([edges[:-1], edges[1:]]),
+            **kwargs
+        )
     
-    def create_similarity_distribution(self, results_df: pd.DataFrame) -> go.Figure:
+    @staticmethod
+    def _with_future_return(results_df: pd.DataFrame) -> pd.DataFrame:
+        """将来リターンが欠損していない行を抽出（読み取り専用で使うためコピーしない）"""
+        return results_df[results_df['future_return'].notna()]
+    
+    def create_similarity_distribution(self, results_df: pd.DataFrame) -> 'go.Figure':
         """類似度の分布をヒストグラムで表示"""
+        import plotly.graph_objects as go
+        
         fig = go.Figure()
-        fig.add_trace(go.Histogram(
-            x=results_df['similarity'],
-            nbinsx=50,
+        fig.add_trace(self._histogram_bar(
+            results_df['similarity'],
             name='類似度',
             marker_color='rgba(0, 123, 255, 0.7)',
-            hovertemplate='類似度: %{x:.3f}<br>件数: %{y}<extra></extra>'
+            hovertemplate='類似度: %{customdata[0]:.3f}〜%{customdata[1]:.3f}<br>件数: %{y}<extra></extra>'
         ))
         
         mean_sim = results_df['similarity'].mean()
@@ -50,9 +96,22 @@ class Visualizer:
         )
         return fig
     
-    def create_top_matches_by_symbol(self, results_df: pd.DataFrame, top_n: int = 15) -> go.Figure:
-        """銘柄別マッチ数の棒グラフ"""
-        symbol_counts = results_df['symbol'].value_counts().head(top_n)
+    def create_top_matches_by_symbol(
+        self,
+        results_df: pd.DataFrame,
+        top_n: int = 15,
+        symbol_counts: Optional[pd.Series] = None
+    ) -> 'go.Figure':
+        """
+        銘柄別マッチ数の棒グラフ
+        
+        symbol_counts に集計済みの results_df['symbol'].value_counts() を渡すと再集計しない
+        """
+        import plotly.graph_objects as go
+        
+        if symbol_counts is None:
+            symbol_counts = results_df['symbol'].value_counts()
+        symbol_counts = symbol_counts.head(top_n)
         fig = go.Figure()
         fig.add_trace(go.Bar(
             y=symbol_counts.index,
@@ -72,9 +131,19 @@ class Visualizer:
         )
         return fig
     
-    def create_future_return_distribution(self, results_df: pd.DataFrame) -> go.Figure:
-        """将来リターンの分布"""
-        df_filtered = results_df[results_df['future_return'].notna()].copy()
+    def create_future_return_distribution(
+        self,
+        results_df: pd.DataFrame,
+        with_return: Optional[pd.DataFrame] = None
+    ) -> 'go.Figure':
+        """
+        将来リターンの分布
+        
+        with_return に将来リターンが欠損していない行を渡すと、マスクを作り直さない
+        """
+        import plotly.graph_objects as go
+        
+        df_filtered = self._with_future_return(results_df) if with_return is None else with_return
         if len(df_filtered) == 0:
             fig = go.Figure()
             fig.add_annotation(
@@ -86,12 +155,11 @@ class Visualizer:
             return fig
         
         fig = go.Figure()
-        fig.add_trace(go.Histogram(
-            x=df_filtered['future_return'] * 100,
-            nbinsx=50,
+        fig.add_trace(self._histogram_bar(
+            df_filtered['future_return'] * 100,
             name='将来リターン',
             marker_color='rgba(40, 167, 69, 0.7)',
-            hovertemplate='リターン: %{x:.2f}%<br>件数: %{y}<extra></extra>'
+            hovertemplate='リターン: %{customdata[0]:.2f}%〜%{customdata[1]:.2f}%<br>件数: %{y}<extra></extra>'
         ))
         fig.add_vline(x=0, line_dash="dash", line_color="red", annotation_text="0%", annotation_position="top")
         mean_return = df_filtered['future_return'].mean() * 100
@@ -107,16 +175,31 @@ class Visualizer:
         )
         return fig
     
-    def create_similarity_vs_return(self, results_df: pd.DataFrame) -> go.Figure:
-        """類似度 vs 将来リターンの散布図"""
-        df_filtered = results_df[results_df['future_return'].notna()].copy()
+    def create_similarity_vs_return(
+        self,
+        results_df: pd.DataFrame,
+        with_return: Optional[pd.DataFrame] = None
+    ) -> 'go.Figure':
+        """
+        類似度 vs 将来リターンの散布図
+        
+        with_return に将来リターンが欠損していない行を渡すと、マスクを作り直さない
+        """
+        import plotly.graph_objects as go
+        
+        df_filtered = self._with_future_return(results_df) if with_return is None else with_return
         if len(df_filtered) == 0:
             fig = go.Figure()
             fig.add_annotation(text="将来リターンデータがありません", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(size=20))
             return fig
         
+        # 点数が多すぎるとブラウザ側の描画が固まるため、類似度の上位だけに絞る
+        if len(df_filtered) > self.max_points:
+            df_filtered = df_filtered.nlargest(self.max_points, 'similarity')
+        
+        # SVGではなくWebGLで描画し、点数が多くても操作が重くならないようにする
         fig = go.Figure()
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=df_filtered['similarity'],
             y=df_filtered['future_return'] * 100,
             mode='markers',
@@ -136,21 +219,20 @@ class Visualizer:
         )
         return fig
     
-    def create_pattern_heatmap(self, results_df: pd.DataFrame, top_n: int = 20) -> go.Figure:
+    def create_pattern_heatmap(self, results_df: pd.DataFrame, top_n: int = 20) -> 'go.Figure':
         """上位マッチのヒートマップ"""
-        top_matches = results_df.head(top_n).copy()
-        heatmap_data = []
-        for _, row in top_matches.iterrows():
-            heatmap_data.append({
-                'symbol': row['symbol'],
-                'similarity': row['similarity'],
-                'future_return': row.get('future_return', 0) * 100 if pd.notna(row.get('future_return')) else 0
-            })
-        df_heatmap = pd.DataFrame(heatmap_data)
+        import plotly.graph_objects as go
+        
+        top_matches = results_df.head(top_n)
+        # 将来リターンがない（列がない・欠損）マッチは0として表示
+        if 'future_return' in top_matches.columns:
+            future_return = (top_matches['future_return'] * 100).fillna(0).to_numpy()
+        else:
+            future_return = np.zeros(len(top_matches))
         fig = go.Figure()
         fig.add_trace(go.Heatmap(
-            z=[df_heatmap['similarity'].values, df_heatmap['future_return'].values],
-            x=df_heatmap['symbol'].values,
+            z=[top_matches['similarity'].to_numpy(), future_return],
+            x=top_matches['symbol'].to_numpy(),
             y=['類似度', '将来リターン (%)'],
             colorscale='Viridis',
             hovertemplate='銘柄: %{x}<br>指標: %{y}<br>値: %{z:.3f}<extra></extra>'
@@ -164,48 +246,115 @@ class Visualizer:
         )
         return fig
     
-    def create_all_plots(self, results_df: pd.DataFrame, symbols_data: Dict = None) -> Dict[str, go.Figure]:
-        """全てのグラフを生成"""
+    def _results_key(self, results_df: pd.DataFrame) -> str:
+        """
+        results_dfの内容とグラフ設定からキャッシュキーを作成
+        
+        Args:
+            results_df: 分析結果
+            
+        Returns:
+            16進のハッシュ文字列
+        """
+        digest = hashlib.sha1(pd.util.hash_pandas_object(results_df, index=True).to_numpy().tobytes())
+        digest.update(repr((list(results_df.columns), self.plotly_theme, self.plotly_height,
+                            self.plotly_width, self.max_points)).encode())
+        return digest.hexdigest()
+    
+    def _cached_plot(self, key: str, graph_type: str, build) -> 'go.Figure':
+        """
+        生成済みのグラフをキャッシュ（メモリ → fig_cache_dir の順）から取得し、なければ生成して保存
+        
+        キャッシュ内のグラフを呼び出し側の変更から守るため、返すのはコピー
+        
+        Args:
+            key: _results_key で作成したキー
+            graph_type: グラフ種別
+            build: グラフを生成する関数
+            
+        Returns:
+            グラフ
+        """
+        import plotly.graph_objects as go
+        import plotly.io as pio
+        
+        fig = self._fig_cache.get((key, graph_type))
+        if fig is not None:
+            self._fig_cache.move_to_end((key, graph_type))
+        cache_file = self.fig_cache_dir / f"{key}_{graph_type}.json" if self.fig_cache_dir else None
+        
+        if fig is None and cache_file is not None and cache_file.exists():
+            fig = pio.from_json(cache_file.read_text(encoding='utf-8'))
+        if fig is None:
+            fig = build()
+            if cache_file is not None:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                cache_file.write_text(fig.to_json(), encoding='utf-8')
+        
+        self._fig_cache[(key, graph_type)] = fig
+        if len(self._fig_cache) > FIG_CACHE_SIZE:
+            self._fig_cache.popitem(last=False)
+        return go.Figure(fig)
+    
+    def clear_cache(self) -> None:
+        """メモリ上のグラフキャッシュを破棄"""
+        self._fig_cache.clear()
+    
+    def create_all_plots(self, results_df: pd.DataFrame, symbols_data: Dict = None) -> Dict[str, 'go.Figure']:
+        """
+        全てのグラフを生成
+        
+        同じ内容のresults_dfで再実行した場合は、生成済みのグラフを再利用する
+        """
         plots = {}
         print("📊 グラフを生成中...")
         graph_types = self.config.get('visualization.graphs', ['similarity_distribution', 'top_matches_by_symbol', 'future_return_distribution', 'similarity_vs_return', 'pattern_heatmap'])
+        # 複数のグラフで使う派生データは1回だけ計算して共有する
+        with_return = self._with_future_return(results_df)
+        symbol_counts = results_df['symbol'].value_counts()
+        builders = {
+            'similarity_distribution': (
+                lambda: self.create_similarity_distribution(results_df), "類似度分布"),
+            'top_matches_by_symbol': (
+                lambda: self.create_top_matches_by_symbol(results_df, symbol_counts=symbol_counts), "銘柄別マッチ数"),
+            'future_return_distribution': (
+                lambda: self.create_future_return_distribution(results_df, with_return), "将来リターン分布"),
+            'similarity_vs_return': (
+                lambda: self.create_similarity_vs_return(results_df, with_return), "類似度vsリターン"),
+            'pattern_heatmap': (
+                lambda: self.create_pattern_heatmap(results_df), "パターンヒートマップ")
+        }
+        key = self._results_key(results_df)
         
-        if 'similarity_distribution' in graph_types:
-            plots['similarity_distribution'] = self.create_similarity_distribution(results_df)
-            print("  ✓ 類似度分布")
-        if 'top_matches_by_symbol' in graph_types:
-            plots['top_matches_by_symbol'] = self.create_top_matches_by_symbol(results_df)
-            print("  ✓ 銘柄別マッチ数")
-        if 'future_return_distribution' in graph_types:
-            plots['future_return_distribution'] = self.create_future_return_distribution(results_df)
-            print("  ✓ 将来リターン分布")
-        if 'similarity_vs_return' in graph_types:
-            plots['similarity_vs_return'] = self.create_similarity_vs_return(results_df)
-            print("  ✓ 類似度vsリターン")
-        if 'pattern_heatmap' in graph_types:
-            plots['pattern_heatmap'] = self.create_pattern_heatmap(results_df)
-            print("  ✓ パターンヒートマップ")
+        for graph_type, (build, label) in builders.items():
+            if graph_type in graph_types:
+                plots[graph_type] = self._cached_plot(key, graph_type, build)
+                print(f"  ✓ {label}")
         
         print(f"✅ {len(plots)}個のグラフを生成しました")
         return plots
     
     def create_summary_stats(self, results_df: pd.DataFrame) -> Dict:
         """サマリー統計を生成"""
+        sim_stats = results_df['similarity'].agg(['mean', 'max', 'min'])
         stats = {
             'total_matches': len(results_df),
             'unique_symbols': results_df['symbol'].nunique(),
-            'avg_similarity': results_df['similarity'].mean(),
-            'max_similarity': results_df['similarity'].max(),
-            'min_similarity': results_df['similarity'].min()
+            'avg_similarity': sim_stats['mean'],
+            'max_similarity': sim_stats['max'],
+            'min_similarity': sim_stats['min']
         }
         if 'future_return' in results_df.columns:
-            returns = results_df['future_return'].dropna()
-            if len(returns) > 0:
+            # 欠損を除いたndarrayに対して符号ごとの件数を1回ずつ数える
+            returns = results_df['future_return'].dropna().to_numpy(dtype=float)
+            if returns.size > 0:
+                positive = int((returns > 0).sum())
+                negative = int((returns < 0).sum())
                 stats.update({
                     'avg_return': returns.mean() * 100,
-                    'median_return': returns.median() * 100,
-                    'positive_returns': (returns > 0).sum(),
-                    'negative_returns': (returns < 0).sum(),
-                    'win_rate': (returns > 0).sum() / len(returns) * 100
+                    'median_return': np.median(returns) * 100,
+                    'positive_returns': positive,
+                    'negative_returns': negative,
+                    'win_rate': positive / returns.size * 100
                 })
         return stats
@@ -0,0 +1,159 @@
+"""
+パターンマッチング用のNumbaカーネル
+
+全ウィンドウとターゲットの相関係数を、ウィンドウごとの中間配列を作らずに
+並列ループで計算する。Numba未インストール時はビルド済みのCython拡張（_rolling）を
+同じインターフェースで使い、どちらもなければ KERNELS_AVAILABLE が False になって
+呼び出し側はNumPy実装を使う
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# fastmath のうち NaN/Inf を仮定しないフラグだけを使う（欠損ウィンドウの判定を残すため）
+FASTMATH_FLAGS = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+# これ以下のウィンドウサイズではサイズを埋め込んだ特殊化カーネルを使う
+# （それより大きいとループ展開の効果が薄く、サイズごとのコンパイル時間が無駄になる）
+MAX_SPECIALIZED_WINDOW_SIZE = 64
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=FASTMATH_FLAGS, inline='always')
+    def _window_pearson(values, start, col, t_centered, t_norm, window_size):
+        """
+        values[start:start+W, col] と中心化済みターゲットの相関係数
+
+        ウィンドウの平均を求めてから中心化した内積と二乗和を取る（W は小さいので
+        2回読んでもキャッシュ内で済み、1パスの二乗和より桁落ちしない）。
+        values はfloat32でもよく、累積はfloat64で行う。定数・欠損を含むウィンドウはNaN
+        呼び出し元にインライン展開されるため、window_size が定数ならループも展開される
+        """
+        total = np.float64(0.0)
+        first = values[start, col]
+        constant = True
+        for k in range(window_size):
+            x = values[start + k, col]
+            if np.isnan(x):
+                return np.nan
+            constant &= x == first
+            total += x
+        if constant or t_norm == 0.0:
+            return np.nan
+
+        mean = total / window_size
+        dot = 0.0
+        ss = 0.0
+        for k in range(window_size):
+            d = values[start + k, col] - mean
+            dot += d * t_centered[k, col]
+            ss += d * d
+        return dot / (np.sqrt(ss) * t_norm)
+
+    def _make_kernels(fixed_window_size):
+        """
+        相関カーネルのPython関数を生成
+
+        fixed_window_size > 0 の場合はその値をクロージャ定数として埋め込む。
+        Numbaはクロージャ変数をコンパイル時定数として扱うため、ウィンドウ内のループ長が
+        固定されて展開される（0の場合は t_centered の行数を使う）
+
+        Returns:
+            (rolling_pearson, rolling_weighted_pearson) 関数
+        """
+        def rolling_pearson(values, col, t_centered, t_norm, out):
+            """
+            col 列の全ウィンドウとターゲットの相関係数を out に書き込む
+
+            values は (N, C)、t_centered は中心化済みターゲット (W, C)、
+            t_norm は col 列の二乗和の平方根。計算できないウィンドウはNaN
+            """
+            window_size = t_centered.shape[0]
+            if fixed_window_size > 0:
+                window_size = fixed_window_size
+            for i in prange(out.shape[0]):
+                out[i] = _window_pearson(values, i, col, t_centered, t_norm, window_size)
+
+        def rolling_weighted_pearson(values, t_centered, t_norms, weights, out):
+            """
+            全ウィンドウについてカラムごとの相関係数の重み付き平均を out に書き込む
+
+            values は (N, C)、t_centered は中心化済みターゲット (W, C)、t_norms は
+            カラムごとの二乗和の平方根 (C,)。計算できないカラムは重みごと除外し、
+            1つも計算できないウィンドウは0
+            """
+            window_size = t_centered.shape[0]
+            if fixed_window_size > 0:
+                window_size = fixed_window_size
+            n_cols = values.shape[1]
+            for i in prange(out.shape[0]):
+                total_similarity = 0.0
+                total_weight = 0.0
+                for c in range(n_cols):
+                    corr = _window_pearson(values, i, c, t_centered, t_norms[c], window_size)
+                    if not np.isnan(corr):
+                        total_similarity += corr * weights[c]
+                        total_weight += weights[c]
+                out[i] = total_similarity / total_weight if total_weight > 0 else 0.0
+
+        return rolling_pearson, rolling_weighted_pearson
+
+    rolling_pearson, rolling_weighted_pearson = (
+        njit(parallel=True, cache=True, fastmath=FASTMATH_FLAGS)(kernel)
+        for kernel in _make_kernels(0)
+    )
+
+    @lru_cache(maxsize=None)
+    def specialized_kernels(window_size: int):
+        """
+        window_sizeを定数として埋め込んだカーネルを取得（ウィンドウサイズごとにキャッシュ）
+
+        ディスクキャッシュ（cache=True）のキーにはクロージャ変数の値が含まれるため、
+        ウィンドウサイズごとに区別され、2回目以降のプロセスではディスクから読み込まれる
+
+        Args:
+            window_size: ウィンドウサイズ
+
+        Returns:
+            (rolling_pearson, rolling_weighted_pearson) 関数
+        """
+        return tuple(
+            njit(parallel=True, cache=True, fastmath=FASTMATH_FLAGS)(kernel)
+            for kernel in _make_kernels(window_size)
+        )
+
+# Numbaがなければ、setup.py でビルドされたCython + OpenMP版を使う
+CYTHON_AVAILABLE = False
+if not NUMBA_AVAILABLE:
+    try:
+        from ._rolling import rolling_pearson, rolling_weighted_pearson
+        CYTHON_AVAILABLE = True
+    except ImportError:
+        pass
+
+KERNELS_AVAILABLE = NUMBA_AVAILABLE or CYTHON_AVAILABLE
+
+
+def kernels_for(window_size: int):
+    """
+    ウィンドウサイズに応じた相関カーネルを取得
+
+    Numbaがあり window_size <= MAX_SPECIALIZED_WINDOW_SIZE の場合は
+    window_sizeを埋め込んで特殊化したカーネル、それ以外は汎用カーネルを返す
+
+    Args:
+        window_size: ウィンドウサイズ
+
+    Returns:
+        (rolling_pearson, rolling_weighted_pearson) 関数
+    """
+    if NUMBA_AVAILABLE and window_size <= MAX_SPECIALIZED_WINDOW_SIZE:
+        return specialized_kernels(window_size)
+    return rolling_pearson, rolling_weighted_pearson
@@ -0,0 +1,98 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+パターンマッチング用の相関カーネル（Cython + OpenMP版）
+
+_kernels のNumbaカーネルと同じ引数・同じ結果を返す。values はfloat32/float64のどちらでもよく、
+平均・内積・二乗和はdoubleで累積する。Numbaを使えない環境向けに
+setup.py でビルドされる（Cython未インストール時はビルドされず、NumPy実装が使われる）
+"""
+
+from cython cimport floating
+from cython.parallel cimport prange
+from libc.math cimport sqrt, isnan, NAN
+
+
+cdef inline double _window_pearson(
+    const floating[:, ::1] values,
+    Py_ssize_t start,
+    Py_ssize_t col,
+    const double[:, ::1] t_centered,
+    double t_norm
+) noexcept nogil:
+    """
+    values[start:start+W, col] と中心化済みターゲットの相関係数
+
+    平均を求めてから中心化した内積と二乗和を取る。定数・欠損を含むウィンドウはNaN
+    """
+    cdef Py_ssize_t window_size = t_centered.shape[0]
+    cdef Py_ssize_t k
+    cdef double x, d, mean
+    cdef double first = values[start, col]
+    cdef double total = 0.0
+    cdef double dot = 0.0
+    cdef double ss = 0.0
+    cdef bint constant = True
+
+    for k in range(window_size):
+        x = values[start + k, col]
+        if isnan(x):
+            return NAN
+        if x != first:
+            constant = False
+        total += x
+    if constant or t_norm == 0.0:
+        return NAN
+
+    mean = total / window_size
+    for k in range(window_size):
+        d = values[start + k, col] - mean
+        dot += d * t_centered[k, col]
+        ss += d * d
+    return dot / (sqrt(ss) * t_norm)
+
+
+def rolling_pearson(
+    const floating[:, ::1] values,
+    Py_ssize_t col,
+    const double[:, ::1] t_centered,
+    double t_norm,
+    double[::1] out
+):
+    """
+    col 列の全ウィンドウとターゲットの相関係数を out に書き込む
+
+    values は (N, C)、t_centered は中心化済みターゲット (W, C)、
+    t_norm は col 列の二乗和の平方根。計算できないウィンドウはNaN
+    """
+    cdef Py_ssize_t i
+    for i in prange(out.shape[0], nogil=True, schedule='static'):
+        out[i] = _window_pearson(values, i, col, t_centered, t_norm)
+
+
+def rolling_weighted_pearson(
+    const floating[:, ::1] values,
+    const double[:, ::1] t_centered,
+    const double[::1] t_norms,
+    const double[::1] weights,
+    double[::1] out
+):
+    """
+    全ウィンドウについてカラムごとの相関係数の重み付き平均を out に書き込む
+
+    計算できないカラムは重みごと除外し、1つも計算できないウィンドウは0
+    """
+    cdef Py_ssize_t i, c
+    cdef double corr, total_similarity, total_weight
+    for i in prange(out.shape[0], nogil=True, schedule='static'):
+        # prange内では += がリダクション扱いになるため、通常の代入で更新する
+        total_similarity = 0.0
+        total_weight = 0.0
+        for c in range(values.shape[1]):
+            corr = _window_pearson(values, i, c, t_centered, t_norms[c])
+            if not isnan(corr):
+                total_similarity = total_similarity + corr * weights[c]
+                total_weight = total_weight + weights[c]
+        if total_weight > 0:
+            out[i] = total_similarity / total_weight
+        else:
+            out[i] = 0.0
@@ -4,11 +4,48 @@
 様々な形式のデータソースから株価・FXデータを読み込む機能を提供
 """
 
+import numpy as np
 import pandas as pd
 import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 
+# 高速JSONパーサー（未インストール時は標準のjsonを使用）
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pyarrowのマルチスレッドCSVリーダー（未インストール時はpd.read_csvを使用）
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+# Numbaはオプション（未インストール時はNumPyで一括比較）
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _any_less(a, b):
+        """a[i] < b[i] となる要素があるか（最初に見つかった時点で打ち切る）"""
+        for i in range(a.size):
+            if a[i] < b[i]:
+                return True
+        return False
+
+# pyarrowで読み込む時点でfloat32にするカラム
+FLOAT32_COLUMNS = ['open', 'high', 'low', 'close']
+
+# load_many が返す価格配列の最後の軸の並び
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
 
 class DataLoader:
     """
@@ -22,6 +59,7 @@ class DataLoader:
         filepath: str,
         date_column: str = 'date',
         parse_dates: bool = True,
+        float32: bool = True,
         **kwargs
     ) -> pd.DataFrame:
         """
@@ -35,22 +73,85 @@ class DataLoader:
             日付カラム名
         parse_dates : bool
             日付を自動パース
+        float32 : bool
+            価格などのfloat64カラムをfloat32に変換する（出来高はfloat64のまま）
         **kwargs : dict
-            pd.read_csvに渡す追加パラメータ
+            pd.read_csvに渡す追加パラメータ（指定した場合はpd.read_csvで読み込む）
         
         Returns:
         --------
         df : DataFrame
             読み込んだデータ
         """
-        df = pd.read_csv(filepath, **kwargs)
+        if pacsv is not None and not kwargs:
+            # マルチスレッドでパースし、価格カラムはパース時点でfloat32にする
+            column_types = {col: pa.float32() for col in FLOAT32_COLUMNS} if float32 else {}
+            table = pacsv.read_csv(
+                filepath,
+                convert_options=pacsv.ConvertOptions(column_types=column_types)
+            )
+            df = table.to_pandas(split_blocks=True, self_destruct=True)
+            del table
+        else:
+            df = pd.read_csv(filepath, **kwargs)
         
         if date_column in df.columns and parse_dates:
             df[date_column] = pd.to_datetime(df[date_column])
             df = df.set_index(date_column)
         
+        if float32:
+            # 価格は有効桁数6〜7桁で十分なので、指標計算のメモリ帯域を半減させる
+            # 出来高は桁が大きくなり得るためfloat64のまま
+            for col in df.select_dtypes('float64').columns:
+                if col != 'volume':
+                    df[col] = df[col].astype(np.float32)
+        
         return df.sort_index()
     
+    @staticmethod
+    def load_many(
+        filepaths: List[str],
+        date_column: str = 'date'
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        複数銘柄のCSVを読み込み、共通の日付軸に揃えた1つの配列にまとめる
+        
+        銘柄ごとのDataFrameではなく (銘柄数, 日数, 5) の連続したfloat32配列で返すため、
+        NumbaやCuPyのカーネルに銘柄・日付の両方向でそのまま渡せる
+        
+        Parameters:
+        -----------
+        filepaths : list of str
+            CSVファイルのパス（ファイル名の拡張子を除いた部分を銘柄コードとする）
+        date_column : str
+            日付カラム名
+        
+        Returns:
+        --------
+        prices : ndarray
+            OHLCV配列 (銘柄数, 日数, 5), float32（取引のない日・カラムはNaN）
+        dates : ndarray
+            全銘柄の日付の和集合 (日数,), datetime64[D]
+        symbols : ndarray
+            銘柄コード (銘柄数,)
+        """
+        frames = [DataLoader.load_csv(path, date_column=date_column) for path in filepaths]
+        symbols = np.array([Path(path).stem for path in filepaths])
+        
+        # 欠けている日を補間すると存在しない値動きを作ってしまうため、NaNのまま残す
+        dates = np.unique(np.concatenate(
+            [df.index.to_numpy(dtype='datetime64[D]') for df in frames]
+        )) if frames else np.array([], dtype='datetime64[D]')
+        
+        prices = np.full((len(frames), len(dates), len(OHLCV_COLUMNS)), np.nan, dtype=np.float32)
+        for i, df in enumerate(frames):
+            rows = np.searchsorted(dates, df.index.to_numpy(dtype='datetime64[D]'))
+            for j, col in enumerate(OHLCV_COLUMNS):
+                if col in df.columns:
+                    prices[i, rows, j] = df[col].to_numpy(dtype=np.float32)
+        
+        return prices, dates, symbols
+    
     @staticmethod
     def load_json(
         filepath: str,
@@ -74,8 +175,13 @@ class DataLoader:
         df : DataFrame
             読み込んだデータ
         """
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if orjson is not None:
+            # バイト列のままC実装でパースし、Pythonのstr化とjsonモジュールを経由しない
+            with open(filepath, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         
         if isinstance(data, dict):
             # 辞書形式の場合、orientに応じて変換
@@ -152,7 +258,15 @@ class DataLoader:
         high_col = ohlc_cols['high']
         low_col = ohlc_cols['low']
         
-        if (df[high_col] < df[low_col]).any():
+        # Boolean Seriesを作らずndarray上で比較（Numbaがあれば最初の違反で打ち切る）
+        high = df[high_col].to_numpy()
+        low = df[low_col].to_numpy()
+        if NUMBA_AVAILABLE and high.dtype == low.dtype and high.dtype.kind == 'f':
+            has_violation = _any_less(high, low)
+        else:
+            has_violation = bool(np.less(high, low).any())
+        
+        if has_violation:
             print("警告: 高値が安値より低いデータがあります")
             return False
         
@@ -4,9 +4,152 @@
 移動平均、RSI、MACDなどのテクニカル指標を計算
 """
 
+import multiprocessing
 import pandas as pd
 import numpy as np
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Optional
+
+# bottleneckはオプション（未インストール時はpandasのrollingを使用）
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+# Numbaはオプション（未インストール時はpandas実装を使用）
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _gain_loss(values, i):
+        """i番目の値動きを (上昇幅, 下落幅) に分解（先頭とNaNは (0, 0)）"""
+        if i == 0:
+            return 0.0, 0.0
+        delta = values[i] - values[i - 1]
+        if delta > 0:
+            return delta, 0.0
+        if delta < 0:
+            return 0.0, -delta
+        return 0.0, 0.0
+
+    @njit(cache=True)
+    def _rsi_kernel(values, period):
+        """
+        上昇幅・下落幅の移動和を1パスで更新しながらRSIを計算
+
+        pandas版（diff → where → rolling.mean）と同じ定義。移動和の丸め誤差で
+        0になるべき下落幅が残らないよう、ウィンドウ内の非ゼロ要素数も数えておく
+        """
+        n = values.size
+        out = np.full(n, np.nan)
+        gain_sum = 0.0
+        loss_sum = 0.0
+        n_gain = 0
+        n_loss = 0
+
+        for i in range(n):
+            gain, loss = _gain_loss(values, i)
+            gain_sum += gain
+            loss_sum += loss
+            n_gain += gain > 0
+            n_loss += loss > 0
+
+            if i >= period:
+                gain, loss = _gain_loss(values, i - period)
+                gain_sum -= gain
+                loss_sum -= loss
+                n_gain -= gain > 0
+                n_loss -= loss > 0
+
+            if i >= period - 1:
+                g = gain_sum if n_gain > 0 else 0.0
+                l = loss_sum if n_loss > 0 else 0.0
+                if l > 0:
+                    out[i] = 100.0 * g / (g + l)
+                elif g > 0:
+                    out[i] = 100.0
+
+        return out
+
+    @njit(cache=True, error_model='numpy')
+    def _stochastic_kernel(high, low, close, k_period, d_period):
+        """
+        ストキャスティクスの%Kと%Dを1パスで計算（欠損値を含まない配列用）
+
+        窓内の最安値・最高値は単調キュー（インデックスの配列）で O(1) 償却で更新し、
+        %Dは直近d_period個の%Kをその場で平均する
+        """
+        n = close.size
+        k = np.full(n, np.nan)
+        d = np.full(n, np.nan)
+        min_q = np.empty(n, dtype=np.int64)
+        max_q = np.empty(n, dtype=np.int64)
+        min_head = 0
+        min_tail = 0
+        max_head = 0
+        max_tail = 0
+
+        for i in range(n):
+            while min_tail > min_head and low[min_q[min_tail - 1]] >= low[i]:
+                min_tail -= 1
+            min_q[min_tail] = i
+            min_tail += 1
+            if min_q[min_head] <= i - k_period:
+                min_head += 1
+
+            while max_tail > max_head and high[max_q[max_tail - 1]] <= high[i]:
+                max_tail -= 1
+            max_q[max_tail] = i
+            max_tail += 1
+            if max_q[max_head] <= i - k_period:
+                max_head += 1
+
+            if i >= k_period - 1:
+                lowest = low[min_q[min_head]]
+                highest = high[max_q[max_head]]
+                k[i] = 100.0 * (close[i] - lowest) / (highest - lowest)
+
+                if i >= k_period + d_period - 2:
+                    total = 0.0
+                    for j in range(i - d_period + 1, i + 1):
+                        total += k[j]
+                    d[i] = total / d_period
+
+        return k, d
+
+    @njit(cache=True)
+    def _ema_kernel(values, spans):
+        """
+        複数期間のEMA（adjust=False）を1パスでまとめて計算
+
+        各時点の値を1回読み込み、全期間の漸化式を同じ値で更新する。
+        漸化式は誤差が蓄積しないよう常にfloat64で計算し、出力のみvaluesのdtypeで保持する
+
+        Returns:
+            EMA配列 (len(values), len(spans))
+        """
+        n = values.size
+        m = spans.size
+        out = np.empty((n, m), dtype=values.dtype)
+        alphas = 2.0 / (spans.astype(np.float64) + 1.0)
+        ema = np.empty(m, dtype=np.float64)
+        for j in range(m):
+            ema[j] = values[0]
+            out[0, j] = values[0]
+
+        for i in range(1, n):
+            x = values[i]
+            for j in range(m):
+                ema[j] += alphas[j] * (x - ema[j])
+                out[i, j] = ema[j]
+
+        return out
 
 
 class TechnicalIndicators:
@@ -14,6 +157,39 @@ class TechnicalIndicators:
     テクニカル指標を計算するクラス
     """
     
+    @staticmethod
+    def _rolling(data: pd.Series, period: int, stat: str) -> pd.Series:
+        """
+        移動統計量を計算（bottleneckがあればpandasのrollingを経由せずC実装を直接呼ぶ）
+        
+        Parameters:
+        -----------
+        data : Series
+            価格データ
+        period : int
+            期間
+        stat : str
+            統計量 ('mean', 'std', 'min', 'max')。stdはpandasと同じく不偏標準偏差
+        
+        Returns:
+        --------
+        rolling : Series
+            移動統計量（期間に満たない位置と欠損を含む窓はNaN）
+        """
+        if bn is None or not 1 <= period <= len(data):
+            return getattr(data.rolling(window=period), stat)()
+        
+        # bottleneckは入力のdtypeで累積するため、float32でも必ずfloat64で計算する
+        # （float32のまま渡すと長い系列で移動和が大きくずれる）。出力は元のdtypeに戻す
+        values = data.to_numpy(dtype=np.float64)
+        if stat == 'std':
+            result = bn.move_std(values, period, min_count=period, ddof=1)
+        else:
+            result = getattr(bn, f'move_{stat}')(values, period, min_count=period)
+        if data.dtype == np.float32:
+            result = result.astype(np.float32)
+        return pd.Series(result, index=data.index, name=data.name)
+    
     @staticmethod
     def sma(data: pd.Series, period: int) -> pd.Series:
         """
@@ -31,7 +207,7 @@ class TechnicalIndicators:
         sma : Series
             移動平均
         """
-        return data.rolling(window=period).mean()
+        return TechnicalIndicators._rolling(data, period, 'mean')
     
     @staticmethod
     def ema(data: pd.Series, period: int) -> pd.Series:
@@ -50,6 +226,12 @@ class TechnicalIndicators:
         ema : Series
             指数移動平均
         """
+        values = data.to_numpy(dtype=np.float64)
+        if NUMBA_AVAILABLE and len(values) > 0 and not np.isnan(values).any():
+            # 欠損がなければ漸化式をそのままカーネルで回す（ewmの汎用処理を通さない）
+            ema = _ema_kernel(values, np.array([period], dtype=np.float64))[:, 0]
+            return pd.Series(ema, index=data.index, name=data.name)
+        
         return data.ewm(span=period, adjust=False).mean()
     
     @staticmethod
@@ -69,9 +251,17 @@ class TechnicalIndicators:
         rsi : Series
             RSI値
         """
-        delta = data.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+        if NUMBA_AVAILABLE:
+            return pd.Series(
+                _rsi_kernel(data.to_numpy(dtype=np.float64), period),
+                index=data.index,
+                name=data.name
+            )
+        
+        # 上昇幅・下落幅は分岐なしの fmax で分解（fmaxはNaNを無視するため先頭の差分は0になる）
+        delta = np.diff(data.to_numpy(dtype=np.float64), prepend=np.nan)
+        gain = pd.Series(np.fmax(delta, 0.0), index=data.index, name=data.name).rolling(window=period).mean()
+        loss = pd.Series(np.fmax(-delta, 0.0), index=data.index, name=data.name).rolling(window=period).mean()
         
         rs = gain / loss
         rsi = 100 - (100 / (1 + rs))
@@ -145,7 +335,7 @@ class TechnicalIndicators:
             下側バンド
         """
         middle = TechnicalIndicators.sma(data, period)
-        std = data.rolling(window=period).std()
+        std = TechnicalIndicators._rolling(data, period, 'std')
         
         upper = middle + (std * std_dev)
         lower = middle - (std * std_dev)
@@ -178,12 +368,16 @@ class TechnicalIndicators:
         atr : Series
             ATR値
         """
-        high_low = high - low
-        high_close = np.abs(high - close.shift())
-        low_close = np.abs(low - close.shift())
+        # True Rangeは一時DataFrameを作らずndarray上で1式で計算
+        h = high.to_numpy(dtype=float)
+        l = low.to_numpy(dtype=float)
+        prev_close = np.empty_like(h)
+        prev_close[0] = np.nan
+        prev_close[1:] = close.to_numpy(dtype=float)[:-1]
         
-        tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        atr = tr.rolling(window=period).mean()
+        # fmaxはNaNを無視する（先頭行は前日終値がないため high - low になる）
+        tr = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+        atr = pd.Series(tr, index=high.index).rolling(window=period).mean()
         
         return atr
     
@@ -218,14 +412,48 @@ class TechnicalIndicators:
         d : Series
             %D
         """
-        lowest_low = low.rolling(window=k_period).min()
-        highest_high = high.rolling(window=k_period).max()
+        if NUMBA_AVAILABLE and k_period >= 1 and d_period >= 1:
+            h = high.to_numpy(dtype=np.float64)
+            l = low.to_numpy(dtype=np.float64)
+            c = close.to_numpy(dtype=np.float64)
+            if not (np.isnan(h).any() or np.isnan(l).any() or np.isnan(c).any()):
+                # 最安値・最高値・%Dの3つの移動窓を1パスで処理
+                k, d = _stochastic_kernel(h, l, c, k_period, d_period)
+                return pd.Series(k, index=close.index), pd.Series(d, index=close.index)
+        
+        lowest_low = TechnicalIndicators._rolling(low, k_period, 'min')
+        highest_high = TechnicalIndicators._rolling(high, k_period, 'max')
         
         k = 100 * (close - lowest_low) / (highest_high - lowest_low)
-        d = k.rolling(window=d_period).mean()
+        d = TechnicalIndicators._rolling(k, d_period, 'mean')
         
         return k, d
     
+    @staticmethod
+    def _batch_sma(values: np.ndarray, periods: list) -> np.ndarray:
+        """
+        複数期間の単純移動平均を1回の累積和からまとめて計算（欠損値を含まない配列用）
+        
+        Parameters:
+        -----------
+        values : ndarray
+            価格データ
+        periods : list
+            期間のリスト
+        
+        Returns:
+        --------
+        sma : ndarray
+            移動平均 (len(values), len(periods))
+        """
+        # 累積和は桁落ちを避けるためfloat64で行い、結果はvaluesのdtypeに戻す
+        csum = np.concatenate([[0.0], np.cumsum(values, dtype=np.float64)])
+        out = np.full((len(values), len(periods)), np.nan, dtype=values.dtype)
+        for k, period in enumerate(periods):
+            if period <= len(values):
+                out[period - 1:, k] = (csum[period:] - csum[:-period]) / period
+        return out
+    
     @staticmethod
     def add_all_indicators(
         df: pd.DataFrame,
@@ -254,37 +482,98 @@ class TechnicalIndicators:
                 'close': 'close'
             }
         
-        df_result = df.copy()
         close = df[ohlc_cols['close']]
         high = df[ohlc_cols['high']]
         low = df[ohlc_cols['low']]
         
+        # 指標は辞書に集め、最後に1回だけ連結する（カラムの逐次追加によるブロック再構築を避ける）
+        new_cols = {}
+        ma_periods = [5, 25, 75]
+        # 計算はfloat64で行う（MACDは大きなEMA同士の差なのでfloat32では符号が変わりうる）。
+        # 入力がfloat32（DataLoader.load_csvの既定）なら、SMA/EMAの列だけfloat32で保持する
+        close_values = close.to_numpy(dtype=np.float64)
+        storage_dtype = np.float32 if close.dtype == np.float32 else np.float64
+        
+        # 欠損がなければSMAは1回の累積和から、EMA（MACD用の12/26を含む）は1パスのカーネルでまとめて計算
+        batched = NUMBA_AVAILABLE and len(close_values) > 0 and not np.isnan(close_values).any()
+        if batched:
+            smas = TechnicalIndicators._batch_sma(close_values, ma_periods)
+            emas = _ema_kernel(close_values, np.array(ma_periods + [12, 26], dtype=np.float64))
+        
         # 移動平均
-        for period in [5, 25, 75]:
-            df_result[f'SMA_{period}'] = TechnicalIndicators.sma(close, period)
-            df_result[f'EMA_{period}'] = TechnicalIndicators.ema(close, period)
+        for k, period in enumerate(ma_periods):
+            if batched:
+                new_cols[f'SMA_{period}'] = smas[:, k].astype(storage_dtype, copy=False)
+                new_cols[f'EMA_{period}'] = emas[:, k].astype(storage_dtype, copy=False)
+            else:
+                new_cols[f'SMA_{period}'] = TechnicalIndicators.sma(close, period)
+                new_cols[f'EMA_{period}'] = TechnicalIndicators.ema(close, period)
         
         # RSI
-        df_result['RSI_14'] = TechnicalIndicators.rsi(close, 14)
+        new_cols['RSI_14'] = TechnicalIndicators.rsi(close, 14)
         
         # MACD
-        macd, signal, histogram = TechnicalIndicators.macd(close)
-        df_result['MACD'] = macd
-        df_result['MACD_Signal'] = signal
-        df_result['MACD_Histogram'] = histogram
+        if batched:
+            macd = pd.Series(emas[:, -2] - emas[:, -1], index=close.index)
+            signal = TechnicalIndicators.ema(macd, 9)
+            histogram = macd - signal
+        else:
+            macd, signal, histogram = TechnicalIndicators.macd(close)
+        new_cols['MACD'] = macd
+        new_cols['MACD_Signal'] = signal
+        new_cols['MACD_Histogram'] = histogram
         
         # ボリンジャーバンド
         upper, middle, lower = TechnicalIndicators.bollinger_bands(close)
-        df_result['BB_Upper'] = upper
-        df_result['BB_Middle'] = middle
-        df_result['BB_Lower'] = lower
+        new_cols['BB_Upper'] = upper
+        new_cols['BB_Middle'] = middle
+        new_cols['BB_Lower'] = lower
         
         # ATR
-        df_result['ATR_14'] = TechnicalIndicators.atr(high, low, close, 14)
+        new_cols['ATR_14'] = TechnicalIndicators.atr(high, low, close, 14)
         
         # ストキャスティクス
         k, d = TechnicalIndicators.stochastic(high, low, close)
-        df_result['Stoch_K'] = k
-        df_result['Stoch_D'] = d
+        new_cols['Stoch_K'] = k
+        new_cols['Stoch_D'] = d
+        
+        indicators = pd.DataFrame(
+            {name: np.asarray(values) for name, values in new_cols.items()},
+            index=df.index
+        )
+        # 既に指標を含むDataFrameでも、従来どおり同名カラムは上書きする
+        return pd.concat([df.drop(columns=indicators.columns, errors='ignore'), indicators], axis=1)
+    
+    @staticmethod
+    def add_all_indicators_batch(
+        dfs: List[pd.DataFrame],
+        ohlc_cols: Optional[dict] = None,
+        max_workers: Optional[int] = None
+    ) -> List[pd.DataFrame]:
+        """
+        複数銘柄のDataFrameにテクニカル指標をまとめて追加
+        
+        銘柄ごとの計算は独立しているため、ProcessPoolExecutorで全コアに分散する
+        
+        Parameters:
+        -----------
+        dfs : list of DataFrame
+            銘柄ごとのOHLCデータ
+        ohlc_cols : dict, optional
+            カラム名のマッピング
+        max_workers : int, optional
+            並列プロセス数（Noneの場合はCPUコア数、1の場合は逐次実行）
+        
+        Returns:
+        --------
+        dfs_with_indicators : list of DataFrame
+            指標が追加されたデータ（dfsと同じ順序）
+        """
+        add = partial(TechnicalIndicators.add_all_indicators, ohlc_cols=ohlc_cols)
+        
+        if len(dfs) <= 1 or max_workers == 1:
+            return [add(df) for df in dfs]
         
-        return df_result
+        # fork だとNumbaの並列カーネルが起動したスレッド層ごと複製され、終了時に固まるため spawn を使う
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            return list(executor.map(add, dfs))
@@ -2,20 +2,285 @@
 株価・FXのパターンマッチングモジュール
 """
 
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
-from scipy.stats import pearsonr
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import List, Tuple, Optional
 import warnings
 warnings.filterwarnings('ignore')
 
+# bottleneckはオプション（未インストール時はウィンドウごとにNumPyで最小・最大を取る）
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+# CuPyはオプション（use_gpu=True の場合のみ使用）
+try:
+    import cupy as cp
+    GPU_AVAILABLE = cp.cuda.is_available()
+except ImportError:
+    GPU_AVAILABLE = False
+    cp = None
+
+from ._kernels import KERNELS_AVAILABLE, kernels_for
+
+# 検索用配列のカラム順（先頭の終値を 'correlation' で使う）
+SEARCH_COLUMNS = ['close', 'open', 'high', 'low']
+
+# NumPy実装でスレッド並列にする際の1チャンクあたりの最小ウィンドウ数
+PARALLEL_CHUNK_SIZE = 20000
+
+# find_similar_patterns の結果を保持する件数（古いものから破棄）
+RESULTS_CACHE_SIZE = 32
+
+# 正規化用配列のカラム順
+NORMALIZE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# 重み付き相関で使うデフォルトの重み
+DEFAULT_WEIGHTS = {
+    'close': 0.5,
+    'open': 0.2,
+    'high': 0.15,
+    'low': 0.15
+}
+
+
+def _fast_pearson(x: np.ndarray, y: np.ndarray) -> float:
+    """
+    2系列のピアソン相関係数（p値を計算しない分 scipy.stats.pearsonr より軽い）
+    
+    Parameters:
+    -----------
+    x, y : ndarray
+        同じ長さの系列
+    
+    Returns:
+    --------
+    corr : float
+        相関係数（分散0で計算できない場合は0.0）
+    """
+    x = x - x.mean()
+    y = y - y.mean()
+    denom = np.sqrt((x @ x) * (y @ y))
+    return float(x @ y / denom) if denom else 0.0
+
+
+def _array_module(a):
+    """配列に対応するモジュール（CuPy配列なら cupy、それ以外は numpy）"""
+    return cp.get_array_module(a) if cp is not None else np
+
+
+def _prefix_sums(values: np.ndarray) -> dict:
+    """
+    ウィンドウごとの和・二乗和・欠損数を O(1) で引けるよう累積和を前計算
+    
+    Parameters:
+    -----------
+    values : ndarray
+        データ (N, C)（CuPy配列の場合は結果もデバイス上に作る）
+    
+    Returns:
+    --------
+    prefix : dict
+        'centered': 欠損を0にしてカラム平均を引いた値 (N, C)
+        'csum', 'csum2': centered の累積和と二乗の累積和 (N + 1, C)
+        'n_missing': 欠損・無限大の個数の累積和 (N + 1, C)
+    """
+    # 欠損・無限大を含むウィンドウは後でNaNにし、累積和には0として入れる
+    # （無限大をそのまま累積すると、それ以降の全ウィンドウの差分が inf - inf = NaN になる）
+    # float32で保持している価格も、累積和は桁落ちしないようfloat64で取る
+    xp = _array_module(values)
+    missing = ~xp.isfinite(values)
+    centered = xp.where(missing, 0.0, values.astype(np.float64))
+    
+    # 相関係数はシフト不変なので、累積和の桁落ちを抑えるため全体平均を引いておく
+    centered = centered - centered.mean(axis=0)
+    
+    zeros = xp.zeros((1, values.shape[1]))
+    return {
+        'centered': centered,
+        'csum': xp.concatenate([zeros, xp.cumsum(centered, axis=0)]),
+        'csum2': xp.concatenate([zeros, xp.cumsum(centered ** 2, axis=0)]),
+        'n_missing': xp.concatenate([zeros, xp.cumsum(missing, axis=0)])
+    }
+
+
+def _rolling_pearson(
+    prefix: dict,
+    col: int,
+    target: np.ndarray,
+    start: int = 0,
+    stop: Optional[int] = None
+) -> np.ndarray:
+    """
+    系列の全ウィンドウとターゲットのピアソン相関係数を一括計算
+    
+    ターゲットを中心化しておけば分子はウィンドウとの内積1回（行列ベクトル積）で、
+    ウィンドウ側の二乗偏差和は累積和の差分で O(N) で求まる
+    
+    Parameters:
+    -----------
+    prefix : dict
+        _prefix_sums で前計算した累積和
+    col : int
+        対象カラムの位置
+    target : ndarray
+        ターゲット (W,)（prefix と同じデバイス上の配列）
+    start, stop : int
+        計算するウィンドウの開始位置の範囲（stop=Noneで最後のウィンドウまで）
+    
+    Returns:
+    --------
+    corr : ndarray
+        開始位置 start .. stop - 1 の各ウィンドウとターゲットの相関係数。
+        分散0または欠損・無限大を含むウィンドウはNaN
+    """
+    xp = _array_module(target)
+    window_size = len(target)
+    if stop is None:
+        stop = len(prefix['centered']) - window_size + 1
+    csum = prefix['csum'][:, col]
+    csum2 = prefix['csum2'][:, col]
+    n_missing = prefix['n_missing'][:, col]
+    
+    target = target.astype(np.float64)
+    t_centered = target - target.mean()
+    t_ss = t_centered @ t_centered
+    
+    centered = prefix['centered'][start:stop + window_size - 1, col]
+    numerator = xp.lib.stride_tricks.sliding_window_view(centered, window_size) @ t_centered
+    sums = csum[start + window_size:stop + window_size] - csum[start:stop]
+    w_ss = (csum2[start + window_size:stop + window_size] - csum2[start:stop]) - sums ** 2 / window_size
+    
+    # 累積和の丸め誤差以下の分散しかないウィンドウは定数とみなす
+    tolerance = 1e3 * np.finfo(np.float64).eps * csum2[-1]
+    valid = (
+        (w_ss > tolerance)
+        & (t_ss > 0)
+        & ((n_missing[start + window_size:stop + window_size] - n_missing[start:stop]) == 0)
+    )
+    
+    corr = xp.full(len(numerator), np.nan)
+    corr[valid] = numerator[valid] / xp.sqrt(w_ss[valid] * t_ss)
+    return corr
+
+
+def _correlation_similarities(
+    prefix: dict,
+    target: np.ndarray,
+    method: str,
+    start: int = 0,
+    stop: Optional[int] = None
+) -> np.ndarray:
+    """
+    累積和から 'correlation' / 'weighted' の類似度を計算（NumPy/CuPy共通）
+    
+    Parameters:
+    -----------
+    prefix : dict
+        _prefix_sums で前計算した累積和
+    target : ndarray
+        対象パターン (W, 4)、カラム順は SEARCH_COLUMNS（prefix と同じデバイス上の配列）
+    method : str
+        類似度計算方法 ('correlation', 'weighted')
+    start, stop : int
+        計算するウィンドウの開始位置の範囲（stop=Noneで最後のウィンドウまで）
+    
+    Returns:
+    --------
+    similarities : ndarray
+        各ウィンドウの類似度
+    """
+    xp = _array_module(target)
+    
+    if method == 'correlation':
+        # 終値ベースの相関係数（計算できないウィンドウは0）
+        corr = _rolling_pearson(prefix, 0, target[:, 0], start, stop)
+        return xp.nan_to_num(corr, nan=0.0)
+    
+    # 重み付き相関係数（計算できないカラムは重みごと除外）
+    weights = xp.asarray([DEFAULT_WEIGHTS[col] for col in SEARCH_COLUMNS])
+    corr = xp.stack([
+        _rolling_pearson(prefix, c, target[:, c], start, stop)
+        for c in range(len(SEARCH_COLUMNS))
+    ], axis=1)
+    valid = ~xp.isnan(corr)
+    total_weight = valid.astype(weights.dtype) @ weights
+    total_similarity = xp.where(valid, corr, 0.0) @ weights
+    has_weight = total_weight > 0
+    return xp.where(has_weight, total_similarity / xp.where(has_weight, total_weight, 1.0), 0.0)
+
+
+def _top_n_indices(values: np.ndarray, n: int) -> np.ndarray:
+    """
+    値の大きい順に上位n件のインデックスを返す（同値は元の順番を優先）
+    
+    全体をソートせず np.partition でn番目の値を求め、それ以上の要素だけを並べる
+    
+    Parameters:
+    -----------
+    values : ndarray
+        スコア (R,)
+    n : int
+        取得する件数
+    
+    Returns:
+    --------
+    indices : ndarray
+        上位n件のインデックス（降順）
+    """
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+    if n >= len(values):
+        return np.argsort(-values, kind='stable')
+    
+    # n番目の値より大きいものは全て、同値のものは先頭から足りない分だけ採用
+    kth = np.partition(values, len(values) - n)[len(values) - n]
+    above = np.flatnonzero(values > kth)
+    tied = np.flatnonzero(values == kth)[:n - len(above)]
+    indices = np.concatenate([above, tied])
+    return indices[np.lexsort((indices, -values[indices]))]
+
+
+def _minmax_windows(values: np.ndarray, window_size: int) -> np.ndarray:
+    """
+    全ウィンドウをカラムごとにMin-Max正規化（値幅0のカラムは0.5、欠損を含むウィンドウはNaN）
+    
+    Parameters:
+    -----------
+    values : ndarray
+        データ (N, C)
+    window_size : int
+        ウィンドウサイズ
+    
+    Returns:
+    --------
+    normalized : ndarray
+        正規化済みウィンドウ (N - window_size + 1, window_size, C)
+    """
+    windows = sliding_window_view(values, window_size, axis=0).transpose(0, 2, 1)
+    if bn is not None:
+        # bottleneckの移動最小・最大はO(N)（ウィンドウ内を毎回走査しない）
+        min_val = bn.move_min(values, window_size, axis=0)[window_size - 1:, None, :]
+        value_range = bn.move_max(values, window_size, axis=0)[window_size - 1:, None, :] - min_val
+    else:
+        min_val = windows.min(axis=1, keepdims=True)
+        value_range = windows.max(axis=1, keepdims=True) - min_val
+    flat = value_range == 0
+    return np.where(flat, 0.5, (windows - min_val) / np.where(flat, 1.0, value_range))
+
 
 class CandlePatternMatcher:
     """
     ローソク足パターンのマッチングを行うクラス
     """
     
-    def __init__(self, df: pd.DataFrame, ohlc_cols: dict = None):
+    def __init__(self, df: pd.DataFrame, ohlc_cols: dict = None, use_gpu: bool = False):
         """
         Parameters:
         -----------
@@ -23,7 +288,13 @@ class CandlePatternMatcher:
             株価データ (index: datetime, columns: open, high, low, close, volume)
         ohlc_cols : dict
             OHLCカラム名の辞書 {'open': 'open', 'high': 'high', 'low': 'low', 'close': 'close', 'volume': 'volume'}
+        use_gpu : bool
+            'correlation' / 'weighted' の類似度をCuPyでGPU上で計算する（GPUがなければCPU）
         """
+        self.use_gpu = use_gpu and GPU_AVAILABLE
+        if use_gpu and not GPU_AVAILABLE:
+            print("警告: GPUが使用できないため、CPUで計算します")
+        
         self.df = df.copy()
         
         # デフォルトのカラム名
@@ -42,6 +313,118 @@ class CandlePatternMatcher:
         if not isinstance(self.df.index, pd.DatetimeIndex):
             raise ValueError("DataFrameのindexはDatetimeIndexである必要があります")
     
+    @property
+    def df(self) -> pd.DataFrame:
+        """検索対象のデータ"""
+        return self._df
+    
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        self._df = df
+        self.clear_cache()
+    
+    def clear_cache(self):
+        """
+        検索用の配列キャッシュと検索結果のキャッシュを破棄
+        
+        self.df を代入し直した場合は自動で破棄される。self.df の値をその場で
+        書き換えた場合は、次の検索の前に呼び出すこと
+        """
+        self._cache = None
+        self._results_cache = OrderedDict()
+    
+    def _arrays(self) -> dict:
+        """
+        検索に使うOHLC配列と累積和を取得（初回のみ計算してキャッシュ）
+        
+        Returns:
+        --------
+        cache : dict
+            'values': (close, open, high, low) の順のfloat32配列 (N, 4)
+            'prefix': values の累積和（_prefix_sums、NumPy実装で使うため初回参照時に計算）
+            'gpu_prefix': デバイス上の累積和（use_gpu=True の場合に初回参照時に計算）
+            ('future_returns', lookahead): _future_returns の結果
+        """
+        if self._cache is None:
+            # 価格は有効桁数6〜7桁で十分なので、相関計算で読む量を半分にするためfloat32で保持
+            # （平均・内積・二乗和の累積はカーネル・累積和ともfloat64で行う）
+            values = np.ascontiguousarray(
+                self.df[[self.ohlc_cols[col] for col in SEARCH_COLUMNS]].to_numpy(dtype=np.float32)
+            )
+            self._cache = {'values': values}
+        return self._cache
+    
+    @staticmethod
+    def _relative_normalize_array(window_arr: np.ndarray, base_close: float) -> np.ndarray:
+        """
+        基準終値からの変化率による正規化（ndarray版）
+        
+        Parameters:
+        -----------
+        window_arr : ndarray
+            ウィンドウデータ (W, 5)、カラム順は NORMALIZE_COLUMNS
+        base_close : float
+            基準となる終値
+        
+        Returns:
+        --------
+        normalized : ndarray
+            正規化されたデータ (W, 5)（出来高は最後の出来高からの変化率、最後が0以下なら0）
+        """
+        normalized = np.empty(window_arr.shape, dtype=np.float64)
+        normalized[:, :4] = (window_arr[:, :4] - base_close) / base_close
+        
+        base_volume = window_arr[-1, 4]
+        if base_volume > 0:
+            normalized[:, 4] = (window_arr[:, 4] - base_volume) / base_volume
+        else:
+            normalized[:, 4] = 0
+        return normalized
+    
+    @staticmethod
+    def _min_max_normalize_array(window_arr: np.ndarray) -> np.ndarray:
+        """
+        カラムごとのMin-Max正規化（ndarray版）
+        
+        Parameters:
+        -----------
+        window_arr : ndarray
+            ウィンドウデータ (W, C)
+        
+        Returns:
+        --------
+        normalized : ndarray
+            0-1に正規化されたデータ (W, C)（値幅0のカラムは0.5）
+        """
+        min_val = np.nanmin(window_arr, axis=0)
+        value_range = np.nanmax(window_arr, axis=0) - min_val
+        flat = value_range == 0
+        return np.where(flat, 0.5, (window_arr - min_val) / np.where(flat, 1.0, value_range))
+    
+    def _with_columns(self, window_df: pd.DataFrame, normalized: np.ndarray, suffix: str) -> pd.DataFrame:
+        """
+        正規化した配列を '{col}{suffix}' カラムとして元データの右に1回で連結
+        
+        Parameters:
+        -----------
+        window_df : DataFrame
+            元のウィンドウデータ
+        normalized : ndarray
+            正規化されたデータ (W, 5)、カラム順は NORMALIZE_COLUMNS
+        suffix : str
+            カラム名の接尾辞
+        
+        Returns:
+        --------
+        normalized_df : DataFrame
+            正規化カラムを追加したデータ（同名のカラムは置き換え）
+        """
+        new_cols = [f'{col}{suffix}' for col in NORMALIZE_COLUMNS]
+        return pd.concat([
+            window_df.drop(columns=new_cols, errors='ignore'),
+            pd.DataFrame(normalized, index=window_df.index, columns=new_cols)
+        ], axis=1)
+    
     def normalize_window(self, window_df: pd.DataFrame, base_close: float = None) -> pd.DataFrame:
         """
         ウィンドウ内のデータを正規化
@@ -58,25 +441,14 @@ class CandlePatternMatcher:
         normalized_df : DataFrame
             正規化されたデータ
         """
-        normalized_df = window_df.copy()
+        window_arr = window_df[[self.ohlc_cols[col] for col in NORMALIZE_COLUMNS]].to_numpy(dtype=np.float64)
         
         # 基準となる終値を設定
         if base_close is None:
-            base_close = window_df[self.ohlc_cols['close']].iloc[-1]
-        
-        # 価格データの正規化（基準終値からの変化率）
-        for col in ['open', 'high', 'low', 'close']:
-            col_name = self.ohlc_cols[col]
-            normalized_df[f'{col}_norm'] = (window_df[col_name] - base_close) / base_close
+            base_close = window_arr[-1, NORMALIZE_COLUMNS.index('close')]
         
-        # 出来高の正規化
-        base_volume = window_df[self.ohlc_cols['volume']].iloc[-1]
-        if base_volume > 0:
-            normalized_df['volume_norm'] = (window_df[self.ohlc_cols['volume']] - base_volume) / base_volume
-        else:
-            normalized_df['volume_norm'] = 0
-            
-        return normalized_df
+        normalized = self._relative_normalize_array(window_arr, base_close)
+        return self._with_columns(window_df, normalized, '_norm')
     
     def min_max_normalize(self, window_df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -92,29 +464,9 @@ class CandlePatternMatcher:
         normalized_df : DataFrame
             正規化されたデータ
         """
-        normalized_df = window_df.copy()
-        
-        for col in ['open', 'high', 'low', 'close']:
-            col_name = self.ohlc_cols[col]
-            min_val = window_df[col_name].min()
-            max_val = window_df[col_name].max()
-            
-            if max_val != min_val:
-                normalized_df[f'{col}_minmax'] = (window_df[col_name] - min_val) / (max_val - min_val)
-            else:
-                normalized_df[f'{col}_minmax'] = 0.5
-        
-        # 出来高の正規化
-        vol_col = self.ohlc_cols['volume']
-        min_vol = window_df[vol_col].min()
-        max_vol = window_df[vol_col].max()
-        
-        if max_vol != min_vol:
-            normalized_df['volume_minmax'] = (window_df[vol_col] - min_vol) / (max_vol - min_vol)
-        else:
-            normalized_df['volume_minmax'] = 0.5
-            
-        return normalized_df
+        window_arr = window_df[[self.ohlc_cols[col] for col in NORMALIZE_COLUMNS]].to_numpy(dtype=np.float64)
+        normalized = self._min_max_normalize_array(window_arr)
+        return self._with_columns(window_df, normalized, '_minmax')
     
     def calculate_pattern_similarity(
         self, 
@@ -146,42 +498,43 @@ class CandlePatternMatcher:
             return 0.0
         
         if weights is None:
-            weights = {
-                'close': 0.5,
-                'open': 0.2,
-                'high': 0.15,
-                'low': 0.15
-            }
+            weights = DEFAULT_WEIGHTS
         
         if method == 'correlation':
-            # 終値ベースの相関係数
-            try:
-                corr, _ = pearsonr(
-                    target_norm['close_norm'].values,
-                    comparison_norm['close_norm'].values
-                )
-                return corr if not np.isnan(corr) else 0.0
-            except:
+            # 終値ベースの相関係数（カラムがない・欠損や分散0で計算できない場合は0）
+            if 'close_norm' not in target_norm.columns or 'close_norm' not in comparison_norm.columns:
                 return 0.0
+            corr = _fast_pearson(
+                target_norm['close_norm'].to_numpy(dtype=np.float64),
+                comparison_norm['close_norm'].to_numpy(dtype=np.float64)
+            )
+            return corr if np.isfinite(corr) else 0.0
                 
         elif method == 'weighted':
-            # 重み付き相関係数
-            total_similarity = 0.0
-            total_weight = 0.0
+            # 重み付き相関係数（両方にあるカラムだけを (カラム数, W) に積んで1回で計算）
+            cols = [
+                col for col in weights
+                if f'{col}_norm' in target_norm.columns and f'{col}_norm' in comparison_norm.columns
+            ]
+            if not cols:
+                return 0.0
+            
+            norm_cols = [f'{col}_norm' for col in cols]
+            target_arr = target_norm[norm_cols].to_numpy(dtype=np.float64).T
+            comparison_arr = comparison_norm[norm_cols].to_numpy(dtype=np.float64).T
+            
+            # 相関行列の対象×比較ブロックの対角がカラムごとの相関係数
+            with np.errstate(divide='ignore', invalid='ignore'):
+                corr_matrix = np.corrcoef(target_arr, comparison_arr)
+            corr = np.diagonal(corr_matrix[:len(cols), len(cols):])
             
-            for col, weight in weights.items():
-                try:
-                    corr, _ = pearsonr(
-                        target_norm[f'{col}_norm'].values,
-                        comparison_norm[f'{col}_norm'].values
-                    )
-                    if not np.isnan(corr):
-                        total_similarity += corr * weight
-                        total_weight += weight
-                except:
-                    continue
+            # 計算できない（分散0の）カラムは重みごと除外
+            col_weights = np.array([weights[col] for col in cols])
+            valid = ~np.isnan(corr)
+            total_weight = col_weights[valid].sum()
+            total_similarity = (corr[valid] * col_weights[valid]).sum()
             
-            return total_similarity / total_weight if total_weight > 0 else 0.0
+            return float(total_similarity / total_weight) if total_weight > 0 else 0.0
             
         elif method == 'euclidean':
             # ユークリッド距離ベース（Min-Max正規化使用）
@@ -201,6 +554,215 @@ class CandlePatternMatcher:
         
         return 0.0
     
+    def _window_similarities(
+        self,
+        target_start: int,
+        window_size: int,
+        method: str,
+        max_workers: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        対象パターンと全ウィンドウの類似度をまとめて計算
+        
+        相関係数は基準終値による正規化（正のスケールとシフト）で変わらないため、
+        'correlation' / 'weighted' は生の価格系列の相関として計算する。
+        'euclidean' は常にMin-Max正規化したウィンドウ同士の距離を使う
+        
+        Parameters:
+        -----------
+        target_start : int
+            対象パターンの開始インデックス
+        window_size : int
+            ウィンドウサイズ
+        method : str
+            類似度計算方法 ('correlation', 'euclidean', 'weighted')
+        max_workers : int, optional
+            NumPy実装で使うスレッド数（Noneの場合はCPUコア数）
+        
+        Returns:
+        --------
+        similarities : ndarray
+            開始位置 0 .. N - window_size の各ウィンドウの類似度
+        """
+        cache = self._arrays()
+        values = cache['values']
+        target = values[target_start:target_start + window_size]
+        n_windows = len(values) - window_size + 1
+        
+        if method not in ('correlation', 'weighted', 'euclidean'):
+            return np.zeros(n_windows)
+        
+        if self.use_gpu and method in ('correlation', 'weighted'):
+            # 累積和をデバイス上に保持し、全ウィンドウの内積を1回の行列ベクトル積で計算
+            # （ホストに戻すのは類似度の配列だけ）
+            if 'gpu_prefix' not in cache:
+                cache['gpu_prefix'] = _prefix_sums(cp.asarray(values))
+            similarities = _correlation_similarities(cache['gpu_prefix'], cp.asarray(target), method)
+            return cp.asnumpy(similarities)
+        
+        if KERNELS_AVAILABLE and method in ('correlation', 'weighted'):
+            # Numba（またはCython）カーネルでウィンドウごとに平均・内積・二乗和を並列計算
+            # （prangeで全コアを使う）
+            weights = np.array([DEFAULT_WEIGHTS[col] for col in SEARCH_COLUMNS])
+            t_centered = target.astype(np.float64)
+            t_centered -= t_centered.mean(axis=0)
+            t_norms = np.sqrt((t_centered ** 2).sum(axis=0))
+            out = np.empty(n_windows)
+            rolling_pearson, rolling_weighted_pearson = kernels_for(window_size)
+            if method == 'correlation':
+                rolling_pearson(values, 0, t_centered, t_norms[0], out)
+                return np.nan_to_num(out, nan=0.0)
+            rolling_weighted_pearson(values, t_centered, t_norms, weights, out)
+            return out
+        
+        if method in ('correlation', 'weighted') and 'prefix' not in cache:
+            cache['prefix'] = _prefix_sums(values)
+        
+        # ウィンドウは互いに独立なので、連続した範囲に分けてスレッドで計算する
+        # （NumPyの演算中はGILが解放される）
+        n_chunks = min(max_workers or os.cpu_count() or 1, n_windows // PARALLEL_CHUNK_SIZE)
+        if n_chunks <= 1:
+            return self._similarities_range(cache, target, method, 0, n_windows)
+        
+        bounds = np.linspace(0, n_windows, n_chunks + 1).astype(int)
+        with ThreadPoolExecutor(max_workers=n_chunks) as executor:
+            parts = executor.map(
+                lambda b: self._similarities_range(cache, target, method, b[0], b[1]),
+                zip(bounds[:-1], bounds[1:])
+            )
+            return np.concatenate(list(parts))
+    
+    @staticmethod
+    def _similarities_range(
+        cache: dict,
+        target: np.ndarray,
+        method: str,
+        start: int,
+        stop: int
+    ) -> np.ndarray:
+        """
+        開始位置 start .. stop - 1 のウィンドウの類似度をNumPyで計算
+        
+        Parameters:
+        -----------
+        cache : dict
+            _arrays で取得した配列キャッシュ
+        target : ndarray
+            対象パターン (W, 4)
+        method : str
+            類似度計算方法 ('correlation', 'euclidean', 'weighted')
+        start, stop : int
+            ウィンドウの開始位置の範囲
+        
+        Returns:
+        --------
+        similarities : ndarray
+            各ウィンドウの類似度 (stop - start,)
+        """
+        window_size = len(target)
+        
+        if method in ('correlation', 'weighted'):
+            return _correlation_similarities(cache['prefix'], target, method, start, stop)
+        
+        # 'euclidean': カラムごとのRMS距離の平均を類似度に変換（0-1、1が最も類似）
+        windows = _minmax_windows(cache['values'][start:stop + window_size - 1], window_size)
+        target_norm = _minmax_windows(target, window_size)[0]
+        distances = np.sqrt(np.mean((windows - target_norm) ** 2, axis=1))
+        return 1 / (1 + distances.mean(axis=1))
+    
+    def _future_returns(self, lookahead: int) -> dict:
+        """
+        全位置についてlookahead本後までのリターンを計算（lookaheadごとにキャッシュ）
+        
+        Parameters:
+        -----------
+        lookahead : int
+            パターン後の予測期間
+        
+        Returns:
+        --------
+        returns : dict
+            'future_return_%': lookahead本後の終値の変化率 (N,)
+            'max_return_%', 'min_return_%': その間の最高値・最低値の変化率 (N,)
+            （いずれも位置 i の終値基準で、その後のデータが足りない位置はNaN）
+        """
+        cache = self._arrays()
+        key = ('future_returns', lookahead)
+        if key in cache:
+            return cache[key]
+        
+        values = cache['values']
+        close = values[:, SEARCH_COLUMNS.index('close')].astype(np.float64)
+        high = values[:, SEARCH_COLUMNS.index('high')].astype(np.float64)
+        low = values[:, SEARCH_COLUMNS.index('low')].astype(np.float64)
+        n_valid = max(len(close) - lookahead, 0)
+        
+        # 位置 i の終値と、i+1 .. i+lookahead の終値・高値・安値（欠損はpandasと同様に無視）
+        start_price = close[:n_valid]
+        end_price = close[lookahead:lookahead + n_valid]
+        future_high = np.nanmax(sliding_window_view(high[1:], lookahead)[:n_valid], axis=1)
+        future_low = np.nanmin(sliding_window_view(low[1:], lookahead)[:n_valid], axis=1)
+        
+        returns = {}
+        for name, price in [
+            ('future_return_%', end_price),
+            ('max_return_%', future_high),
+            ('min_return_%', future_low)
+        ]:
+            returns[name] = np.full(len(close), np.nan)
+            returns[name][:n_valid] = (price - start_price) / start_price * 100
+        
+        cache[key] = returns
+        return returns
+    
+    def _build_results(
+        self,
+        match_end: np.ndarray,
+        similarities: np.ndarray,
+        window_size: int,
+        lookahead: int
+    ) -> pd.DataFrame:
+        """
+        マッチしたウィンドウの終了位置から結果のDataFrameを組み立てる
+        
+        Parameters:
+        -----------
+        match_end : ndarray
+            マッチしたウィンドウの終了インデックス
+        similarities : ndarray
+            各マッチの類似度
+        window_size : int
+            ウィンドウサイズ
+        lookahead : int
+            パターン後の予測期間
+        
+        Returns:
+        --------
+        results_df : DataFrame
+            類似パターンの結果
+        """
+        returns = self._future_returns(lookahead)
+        
+        results_df = pd.DataFrame({
+            'start_date': self.df.index[match_end - window_size + 1],
+            'end_date': self.df.index[match_end],
+            'similarity': similarities,
+            'future_return_%': returns['future_return_%'][match_end],
+            'max_return_%': returns['max_return_%'][match_end],
+            'min_return_%': returns['min_return_%'][match_end]
+        })
+        
+        # パターンと将来のデータはDataFrameのまま1件ずつ格納
+        pattern_data = np.empty(len(match_end), dtype=object)
+        future_data = np.empty(len(match_end), dtype=object)
+        for k, i in enumerate(match_end):
+            pattern_data[k] = self.df.iloc[i - window_size + 1:i + 1]
+            future_data[k] = self.df.iloc[i + 1:i + lookahead + 1]
+        results_df['pattern_data'] = pattern_data
+        results_df['future_data'] = future_data
+        
+        return results_df
+    
     def find_similar_patterns(
         self,
         target_end_index: int = -1,
@@ -210,11 +772,15 @@ class CandlePatternMatcher:
         min_similarity: float = 0.6,
         method: str = 'correlation',
         normalize_method: str = 'relative',
-        exclude_recent_days: int = 0
+        exclude_recent_days: int = 0,
+        max_workers: Optional[int] = None
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
         類似パターンを検索
         
+        同じ条件での結果は直近 RESULTS_CACHE_SIZE 件までキャッシュし、
+        self.df の再代入または clear_cache() で破棄する
+        
         Parameters:
         -----------
         target_end_index : int
@@ -231,8 +797,11 @@ class CandlePatternMatcher:
             類似度計算方法
         normalize_method : str
             正規化方法 ('relative', 'minmax')
+            （相関係数は正規化で変わらず、'euclidean' は常にMin-Max正規化で比較するため互換用）
         exclude_recent_days : int
             検索から除外する直近のデータ数
+        max_workers : int, optional
+            NumPy実装で類似度計算に使うスレッド数（Noneの場合はCPUコア数）
         
         Returns:
         --------
@@ -251,81 +820,44 @@ class CandlePatternMatcher:
         if len(target_window) < window_size:
             raise ValueError(f"対象パターンのデータが不足: {len(target_window)}/{window_size}")
         
-        # 対象パターンの正規化
-        if normalize_method == 'relative':
-            target_norm = self.normalize_window(target_window)
-        else:
-            target_norm = self.min_max_normalize(target_window)
+        # 同じ条件での再検索はキャッシュから返す（呼び出し側の変更から守るためコピーを返す）
+        key = (
+            target_end_index, window_size, lookahead, top_n,
+            min_similarity, method, exclude_recent_days
+        )
+        if key in self._results_cache:
+            self._results_cache.move_to_end(key)
+            results_df, target_window = self._results_cache[key]
+            return results_df.copy(), target_window.copy()
         
-        # 全期間でスライディングウィンドウ検索
-        results = []
+        # 全ウィンドウの類似度を一括計算（similarities[j] は終了位置 j + window_size - 1 のウィンドウ）
+        similarities = self._window_similarities(target_start, window_size, method, max_workers)
+        
+        # 検索範囲・対象パターンとの重複・類似度閾値で候補を絞る
         search_end = len(self.df) - lookahead - exclude_recent_days
+        end_idx = np.arange(window_size - 1, window_size - 1 + len(similarities))
+        candidates = (
+            (end_idx < search_end)
+            & (np.abs(end_idx - target_end_index) >= window_size)
+            & (similarities >= min_similarity)
+        )
+        match_end = end_idx[candidates]
+        match_sim = similarities[candidates]
         
-        for i in range(window_size - 1, search_end):
-            # 対象パターンと重複する期間をスキップ
-            if abs(i - target_end_index) < window_size:
-                continue
-            
-            # 比較ウィンドウの取得
-            comp_start = i - window_size + 1
-            comp_window = self.df.iloc[comp_start:i + 1]
-            
-            # 正規化
-            if normalize_method == 'relative':
-                comp_norm = self.normalize_window(comp_window)
-            else:
-                comp_norm = self.min_max_normalize(comp_window)
-            
-            # 類似度計算
-            similarity = self.calculate_pattern_similarity(
-                target_norm, comp_norm, method=method
-            )
-            
-            if similarity >= min_similarity:
-                # その後の動きを取得
-                future_start = i + 1
-                future_end = min(i + lookahead + 1, len(self.df))
-                future_data = self.df.iloc[future_start:future_end]
-                
-                if len(future_data) == lookahead:
-                    # リターン計算
-                    start_price = comp_window[self.ohlc_cols['close']].iloc[-1]
-                    end_price = future_data[self.ohlc_cols['close']].iloc[-1]
-                    future_return = (end_price - start_price) / start_price * 100
-                    
-                    # 最高値・最低値の変化
-                    max_price = future_data[self.ohlc_cols['high']].max()
-                    min_price = future_data[self.ohlc_cols['low']].min()
-                    max_return = (max_price - start_price) / start_price * 100
-                    min_return = (min_price - start_price) / start_price * 100
-                    
-                    results.append({
-                        'start_date': comp_window.index[0],
-                        'end_date': comp_window.index[-1],
-                        'similarity': similarity,
-                        'future_return_%': future_return,
-                        'max_return_%': max_return,
-                        'min_return_%': min_return,
-                        'pattern_data': comp_window,
-                        'future_data': future_data
-                    })
-        
-        # 結果をDataFrameに変換
-        if results:
-            results_df = pd.DataFrame([
-                {k: v for k, v in r.items() if k not in ['pattern_data', 'future_data']}
-                for r in results
-            ])
-            results_df = results_df.sort_values('similarity', ascending=False).head(top_n)
-            
-            # pattern_dataとfuture_dataを追加
-            for idx, row_idx in enumerate(results_df.index):
-                results_df.at[row_idx, 'pattern_data'] = results[row_idx]['pattern_data']
-                results_df.at[row_idx, 'future_data'] = results[row_idx]['future_data']
-        else:
+        if len(match_end) == 0:
             results_df = pd.DataFrame()
+        else:
+            # 上位top_n件だけを選び、DataFrameの切り出しはその分だけ行う
+            # （インデックスは従来どおり、閾値を満たした候補の中での順番）
+            order = _top_n_indices(match_sim, top_n)
+            results_df = self._build_results(match_end[order], match_sim[order], window_size, lookahead)
+            results_df.index = order
+        
+        self._results_cache[key] = (results_df, target_window)
+        if len(self._results_cache) > RESULTS_CACHE_SIZE:
+            self._results_cache.popitem(last=False)
         
-        return results_df, target_window
+        return results_df.copy(), target_window.copy()
 
 
 def calculate_statistics(similar_patterns_df: pd.DataFrame) -> dict:
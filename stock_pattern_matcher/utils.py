@@ -7,6 +7,50 @@ import numpy as np
 from typing import Tuple, Optional
 
 
+def _returns_np(prices: np.ndarray) -> np.ndarray:
+    """価格配列の変化率（先頭はNaN）"""
+    prices = prices.astype(np.result_type(prices.dtype, np.float32), copy=False)
+    returns = np.empty(len(prices), dtype=prices.dtype)
+    returns[:1] = np.nan
+    returns[1:] = np.diff(prices) / prices[:-1]
+    return returns
+
+
+def _log_returns_np(prices: np.ndarray) -> np.ndarray:
+    """価格配列の対数リターン（先頭はNaN）"""
+    log_returns = _returns_np(prices)
+    log_returns[1:] = np.log1p(log_returns[1:])
+    return log_returns
+
+
+def _rolling_std_np(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    移動標準偏差（不偏、ウィンドウ内に欠損があればNaN）
+    
+    累積和と二乗の累積和の差分から (S2 - S^2 / W) / (W - 1) で分散を求める
+    """
+    values = np.asarray(values, dtype=np.float64)
+    std = np.full(len(values), np.nan)
+    if window > len(values):
+        return std
+    
+    # 欠損は0として累積し、欠損を含むウィンドウは後でNaNに戻す
+    missing = np.isnan(values)
+    values = np.where(missing, 0.0, values)
+    
+    # 分散はシフト不変なので、二乗和の桁落ちを抑えるため全体平均を引いておく
+    values = values - values.mean()
+    csum = np.concatenate([[0.0], np.cumsum(values)])
+    csum2 = np.concatenate([[0.0], np.cumsum(values ** 2)])
+    n_missing = np.concatenate([[0], np.cumsum(missing)])
+    
+    sums = csum[window:] - csum[:-window]
+    var = ((csum2[window:] - csum2[:-window]) - sums ** 2 / window) / (window - 1)
+    var = np.sqrt(np.maximum(var, 0.0))
+    std[window - 1:] = np.where(n_missing[window:] - n_missing[:-window] == 0, var, np.nan)
+    return std
+
+
 def calculate_returns(prices: pd.Series) -> pd.Series:
     """
     リターン（変化率）を計算
@@ -21,6 +65,10 @@ def calculate_returns(prices: pd.Series) -> pd.Series:
     returns : Series
         リターン
     """
+    values = prices.to_numpy()
+    # 欠損がなければpct_changeの前方補完が不要なので、NumPyで直接計算
+    if values.dtype.kind in 'iuf' and not np.isnan(values).any():
+        return pd.Series(_returns_np(values), index=prices.index, name=prices.name)
     return prices.pct_change()
 
 
@@ -38,6 +86,9 @@ def calculate_log_returns(prices: pd.Series) -> pd.Series:
     log_returns : Series
         対数リターン
     """
+    values = prices.to_numpy()
+    if values.dtype.kind in 'iuf':
+        return pd.Series(_log_returns_np(values), index=prices.index, name=prices.name)
     return np.log(prices / prices.shift(1))
 
 
@@ -63,7 +114,11 @@ def calculate_volatility(
     volatility : Series
         ボラティリティ
     """
-    vol = returns.rolling(window=window).std()
+    values = returns.to_numpy()
+    if values.dtype.kind in 'iuf' and window >= 2:
+        vol = pd.Series(_rolling_std_np(values, window), index=returns.index, name=returns.name)
+    else:
+        vol = returns.rolling(window=window).std()
     
     if annualize:
         # 日次データの場合、252営業日で年率換算
@@ -94,24 +149,26 @@ def detect_outliers(
     is_outlier : Series
         外れ値フラグ
     """
+    if method not in ('iqr', 'zscore'):
+        raise ValueError(f"Unknown method: {method}")
+    
+    # 欠損は統計量の計算から除外し、外れ値としては扱わない（pandas版と同じ）
+    values = data.to_numpy(dtype=np.float64)
+    
     if method == 'iqr':
-        Q1 = data.quantile(0.25)
-        Q3 = data.quantile(0.75)
+        Q1, Q3 = np.nanquantile(values, [0.25, 0.75])
         IQR = Q3 - Q1
         
         lower_bound = Q1 - threshold * IQR
         upper_bound = Q3 + threshold * IQR
         
-        is_outlier = (data < lower_bound) | (data > upper_bound)
-        
-    elif method == 'zscore':
-        z_scores = np.abs((data - data.mean()) / data.std())
-        is_outlier = z_scores > threshold
+        is_outlier = (values < lower_bound) | (values > upper_bound)
         
     else:
-        raise ValueError(f"Unknown method: {method}")
+        z_scores = np.abs((values - np.nanmean(values)) / np.nanstd(values, ddof=1))
+        is_outlier = z_scores > threshold
     
-    return is_outlier
+    return pd.Series(is_outlier, index=data.index, name=data.name)
 
 
 def resample_data(
@@ -240,17 +297,31 @@ def calculate_max_drawdown(prices: pd.Series) -> Tuple[float, pd.Timestamp, pd.T
     trough_date : Timestamp
         谷日
     """
-    cumulative = (1 + prices.pct_change()).cumprod()
-    running_max = cumulative.expanding().max()
-    drawdown = (cumulative - running_max) / running_max
+    values = prices.to_numpy()
+    if values.dtype.kind not in 'iuf' or len(values) < 2 or np.isnan(values).any():
+        # 欠損がある場合はpct_changeの前方補完に合わせてpandasで計算
+        cumulative = (1 + prices.pct_change()).cumprod()
+        running_max = cumulative.expanding().max()
+        drawdown = (cumulative - running_max) / running_max
+        
+        max_drawdown = drawdown.min()
+        trough_date = drawdown.idxmin()
+        
+        # ピーク日を見つける
+        peak_date = cumulative[:trough_date].idxmax()
+        
+        return max_drawdown * 100, peak_date, trough_date
     
-    max_drawdown = drawdown.min()
-    trough_date = drawdown.idxmin()
+    # 累積リターン (1 + r).cumprod() は初日比の価格そのもの（2日目以降）
+    cumulative = values[1:] / values[0]
+    running_max = np.maximum.accumulate(cumulative)
+    drawdown = (cumulative - running_max) / running_max
     
-    # ピーク日を見つける
-    peak_date = cumulative[:trough_date].idxmax()
+    # ピークは谷までの累積リターンの最大値（先頭日はpandas版と同様に対象外）
+    trough = int(drawdown.argmin())
+    peak = int(cumulative[:trough + 1].argmax())
     
-    return max_drawdown * 100, peak_date, trough_date
+    return drawdown[trough] * 100, prices.index[peak + 1], prices.index[trough + 1]
 
 
 def format_number(value: float, decimals: int = 2, percentage: bool = False) -> str:
@@ -3,6 +3,7 @@
 """
 
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import mplfinance as mpf
 import pandas as pd
 import numpy as np
@@ -10,6 +11,8 @@ from typing import List, Optional
 import warnings
 warnings.filterwarnings('ignore')
 
+from .indicators import TechnicalIndicators
+
 
 class PatternVisualizer:
     """
@@ -33,6 +36,21 @@ class PatternVisualizer:
             }
         else:
             self.ohlc_cols = ohlc_cols
+        
+        # mplfinance形式へのカラム名変換（変換不要なカラムは含めない）
+        mpf_names = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+        self._mpf_rename = {
+            self.ohlc_cols[key]: name for key, name in mpf_names.items()
+            if self.ohlc_cols[key] != name
+        }
+        # make_mpf_styleで作成したスタイル（スタイル名ごとに1回だけ作成）
+        self._mpf_styles = {}
+    
+    def _mpf_style(self, style: str) -> dict:
+        """mplfinanceのスタイルを取得（初回のみ作成してキャッシュ）"""
+        if style not in self._mpf_styles:
+            self._mpf_styles[style] = mpf.make_mpf_style(base_mpf_style=style)
+        return self._mpf_styles[style]
     
     def plot_candlestick(
         self, 
@@ -58,27 +76,28 @@ class PatternVisualizer:
         figsize : tuple
             図のサイズ
         """
-        # カラム名をmplfinanceの形式に変換
-        plot_df = df.copy()
-        plot_df = plot_df.rename(columns={
-            self.ohlc_cols['open']: 'Open',
-            self.ohlc_cols['high']: 'High',
-            self.ohlc_cols['low']: 'Low',
-            self.ohlc_cols['close']: 'Close',
-            self.ohlc_cols['volume']: 'Volume'
-        })
-        
-        # 移動平均線の追加
+        # カラム名をmplfinanceの形式に変換（変換が必要なカラムがある場合のみ）
+        rename = {col: name for col, name in self._mpf_rename.items() if col in df.columns}
+        plot_df = df.rename(columns=rename) if rename else df
+        
+        # 移動平均線の追加（欠損がなければ全期間を1回の累積和から計算）
         addplot = []
         if ma_periods:
-            for period in ma_periods:
-                ma = plot_df['Close'].rolling(window=period).mean()
-                addplot.append(mpf.make_addplot(ma, width=1.5))
+            close = plot_df['Close']
+            close_values = close.to_numpy()
+            if close_values.dtype.kind == 'f' and not np.isnan(close_values).any():
+                mas = TechnicalIndicators._batch_sma(close_values, list(ma_periods))
+                addplot = [mpf.make_addplot(mas[:, k], width=1.5) for k in range(len(ma_periods))]
+            else:
+                addplot = [
+                    mpf.make_addplot(close.rolling(window=period).mean(), width=1.5)
+                    for period in ma_periods
+                ]
         
         # プロット
         kwargs = {
             'type': 'candle',
-            'style': style,
+            'style': self._mpf_style(style),
             'title': title,
             'volume': True if 'Volume' in plot_df.columns else False,
             'figsize': figsize,
@@ -276,22 +295,24 @@ class PatternVisualizer:
                 combined_data = row['pattern_data']
             
             # ローソク足の描画（簡易版）
-            for j, (date, candle) in enumerate(combined_data.iterrows()):
-                open_p = candle[self.ohlc_cols['open']]
-                close_p = candle[self.ohlc_cols['close']]
-                high_p = candle[self.ohlc_cols['high']]
-                low_p = candle[self.ohlc_cols['low']]
-                
-                # 陽線・陰線の色分け
-                color = 'red' if close_p >= open_p else 'blue'
-                
-                # 実体
-                height = abs(close_p - open_p)
-                bottom = min(open_p, close_p)
-                ax.bar(j, height, bottom=bottom, color=color, alpha=0.7, width=0.8)
-                
-                # ヒゲ
-                ax.plot([j, j], [low_p, high_p], color='black', linewidth=1)
+            # 1本ずつ描くとアーティストが本数分できるため、実体は1回のbar、ヒゲは1つのLineCollectionで描く
+            open_p = combined_data[self.ohlc_cols['open']].to_numpy(dtype=float)
+            close_p = combined_data[self.ohlc_cols['close']].to_numpy(dtype=float)
+            high_p = combined_data[self.ohlc_cols['high']].to_numpy(dtype=float)
+            low_p = combined_data[self.ohlc_cols['low']].to_numpy(dtype=float)
+            x = np.arange(len(combined_data))
+            
+            # 陽線・陰線の色分け
+            colors = np.where(close_p >= open_p, 'red', 'blue')
+            
+            # 実体
+            ax.bar(x, np.abs(close_p - open_p), bottom=np.minimum(open_p, close_p),
+                   color=colors, alpha=0.7, width=0.8)
+            
+            # ヒゲ
+            wicks = np.stack([np.column_stack([x, low_p]), np.column_stack([x, high_p])], axis=1)
+            ax.add_collection(LineCollection(wicks, colors='black', linewidths=1))
+            ax.autoscale_view()
             
             # パターンと将来の境界線
             if include_future:
@@ -3,10 +3,62 @@
 YAMLファイルから設定を読み込み、Pythonオブジェクトとして提供
 """
 
+import copy
+import json
 import os
-import yaml
+import threading
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
+
+
+@lru_cache(maxsize=None)
+def _yaml():
+    """
+    PyYAMLと使用するLoader/Dumperを取得
+    
+    JSONのサイドカーから読める場合はYAMLを使わないため、importは初回呼び出しまで遅らせる。
+    libyamlのC実装があれば使う（なければ純Python実装）
+    
+    Returns:
+        (yamlモジュール, Loader, Dumper)
+    """
+    import yaml
+    try:
+        from yaml import CSafeLoader as Loader, CSafeDumper as Dumper
+    except ImportError:
+        from yaml import SafeLoader as Loader, SafeDumper as Dumper
+    return yaml, Loader, Dumper
+
+
+# Config.get でキーが見つからなかったことを表す番兵
+_MISSING = object()
+
+# 解析済みの設定（キー: (絶対パス, 更新時刻ns, サイズ)）。ファイルが変わればキーも変わる
+_PARSE_CACHE: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+
+
+def _flatten(config: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+    """
+    ネストした設定の末端の値を、ドット区切りのキーで引ける1段の辞書に変換
+    
+    途中の階層のキー（例: "analysis.pattern_matching"）は含めない（Config.get が階層をたどる）
+    
+    Args:
+        config: 設定の辞書
+        prefix: キーの接頭辞
+        
+    Returns:
+        {"a.b.c": 値, ...} の辞書
+    """
+    flat = {}
+    for k, v in config.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            flat.update(_flatten(v, f"{key}."))
+        else:
+            flat[key] = v
+    return flat
 
 
 class Config:
@@ -23,17 +75,60 @@ class Config:
         
         self.config_path = Path(config_path)
         self._config = self._load_config()
+        self._flat = _flatten(self._config)
     
     def _load_config(self) -> Dict[str, Any]:
         """設定ファイルを読み込み"""
         if not self.config_path.exists():
             raise FileNotFoundError(f"Config file not found: {self.config_path}")
         
+        # 同じ内容のファイルは再解析しない（set()での変更が共有されないようコピーを返す）
+        st = os.stat(self.config_path)
+        key = (str(self.config_path.resolve()), st.st_mtime_ns, st.st_size)
+        if key not in _PARSE_CACHE:
+            _PARSE_CACHE[key] = self._load_sidecar(st.st_mtime_ns)
+        
+        return copy.deepcopy(_PARSE_CACHE[key])
+    
+    def _load_sidecar(self, yaml_mtime_ns: int) -> Dict[str, Any]:
+        """
+        YAMLを変換したJSON（settings.yaml.json）があればそれを読み、なければYAMLを解析して作成
+        
+        JSONの解析はYAMLより桁違いに速い。JSONがYAMLより古い場合は作り直す。
+        JSONで表せない値（日付など）を含む設定や、書き込めない環境ではJSONを作らない
+        
+        Args:
+            yaml_mtime_ns: YAMLファイルの更新時刻（ns）
+            
+        Returns:
+            設定の辞書
+        """
+        sidecar = self.config_path.with_name(self.config_path.name + '.json')
+        try:
+            if sidecar.stat().st_mtime_ns >= yaml_mtime_ns:
+                return json.loads(sidecar.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            pass
+        
         with open(self.config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+            yaml, Loader, _ = _yaml()
+            config = yaml.load(f, Loader=Loader)
+        
+        try:
+            text = json.dumps(config, ensure_ascii=False)
+            # 数値キーの文字列化などで内容が変わる場合は使わない
+            if json.loads(text) == config:
+                sidecar.write_text(text, encoding='utf-8')
+        except (TypeError, ValueError, OSError):
+            pass
         
         return config
     
+    @staticmethod
+    def clear_cache() -> None:
+        """解析済み設定のキャッシュを破棄"""
+        _PARSE_CACHE.clear()
+    
     def get(self, key: str, default: Any = None) -> Any:
         """
         ドット記法で設定値を取得
@@ -43,7 +138,8 @@ class Config:
             default: キーが存在しない場合のデフォルト値
             
         Returns:
-            設定値
+            設定値。途中の階層のキーを指定した場合はその階層の辞書のコピーを返す
+            （書き換えても設定には反映されない。変更は set を使う）
             
         Examples:
             >>> config = Config()
@@ -52,16 +148,26 @@ class Config:
             >>> config.get("analysis.pattern_matching.window_size")
             20
         """
-        keys = key.split('.')
-        value = self._config
+        # 末端の値は読み込み時に平坦化した辞書を1回引くだけ（階層をたどらない）
+        value = self._flat.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
         
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
+        # 途中の階層のキーは階層をたどり、辞書はコピーして返す
+        # （返した辞書の書き換えで平坦化した値と食い違わないようにする）
+        # split でリストを作らず、partition で先頭から1階層ずつ取り出す
+        value = self._config
+        rest = key
+        while True:
+            head, sep, rest = rest.partition('.')
+            if type(value) is not dict:
                 return default
-        
-        return value
+            try:
+                value = value[head]
+            except KeyError:
+                return default
+            if not sep:
+                return copy.deepcopy(value) if type(value) is dict else value
     
     def set(self, key: str, value: Any) -> None:
         """
@@ -80,48 +186,64 @@ class Config:
             config = config[k]
         
         config[keys[-1]] = value
+        
+        # 置き換えた階層の下のキーも変わるため作り直す
+        self._flat = _flatten(self._config)
+        self._clear_properties()
     
     def reload(self) -> None:
         """設定ファイルを再読み込み"""
         self._config = self._load_config()
+        self._flat = _flatten(self._config)
+        self._clear_properties()
+    
+    def _clear_properties(self) -> None:
+        """キャッシュ済みのプロパティ値を破棄（次回アクセス時に設定から読み直す）"""
+        for name in self._CACHED_PROPERTIES:
+            self.__dict__.pop(name, None)
+    
+    # 便利なプロパティ（初回アクセス時の値をインスタンスに保持し、set/reloadで破棄する）
+    _CACHED_PROPERTIES = (
+        'debug_mode', 'gpu_enabled', 'github_owner', 'github_repo',
+        'window_size', 'lookahead', 'top_n', 'min_similarity',
+    )
     
-    # 便利なプロパティ
-    @property
+    @cached_property
     def debug_mode(self) -> bool:
         """デバッグモードが有効かどうか"""
         return self.get("debug.mode", False)
     
-    @property
+    @cached_property
     def gpu_enabled(self) -> bool:
         """GPU使用が有効かどうか"""
         return self.get("gpu.enabled", False)
     
-    @property
+    @cached_property
     def github_owner(self) -> str:
         """GitHubオーナー名"""
         return self.get("github.owner", "")
     
-    @property
+    @cached_property
     def github_repo(self) -> str:
         """GitHubリポジトリ名"""
         return self.get("github.repo", "")
     
-    @property
+    @cached_property
     def window_size(self) -> int:
         """パターンマッチングのウィンドウサイズ"""
         return self.get("analysis.pattern_matching.window_size", 20)
     
-    @property
+    @cached_property
     def lookahead(self) -> int:
         """将来予測期間"""
         return self.get("analysis.pattern_matching.lookahead", 10)
     
-    @property
+    @cached_property
     def top_n(self) -> int:
         """返す上位マッチ数"""
         return self.get("analysis.pattern_matching.top_n", 15)
     
-    @property
+    @cached_property
     def min_similarity(self) -> float:
         """最小類似度"""
         return self.get("analysis.pattern_matching.min_similarity", 0.7)
@@ -130,11 +252,23 @@ class Config:
         return f"Config(config_path={self.config_path})"
     
     def __str__(self) -> str:
-        return yaml.dump(self._config, allow_unicode=True, default_flow_style=False)
+        # ログ出力などで頻繁に呼ばれるため、YAMLより軽いJSONで整形する
+        return json.dumps(self._config, ensure_ascii=False, indent=2, default=str)
+    
+    def to_yaml(self) -> str:
+        """
+        現在の設定をYAML文字列として取得
+        
+        Returns:
+            YAML形式の設定
+        """
+        yaml, _, Dumper = _yaml()
+        return yaml.dump(self._config, Dumper=Dumper, allow_unicode=True, default_flow_style=False)
 
 
 # グローバル設定インスタンス（シングルトン的に使用）
 _global_config = None
+_global_lock = threading.Lock()
 
 
 def get_config(config_path: str = None) -> Config:
@@ -149,7 +283,10 @@ def get_config(config_path: str = None) -> Config:
     """
     global _global_config
     
+    # ロックを取るのは生成が必要な場合だけ（取得後に再確認し、同時に呼ばれても1回だけ読み込む）
     if _global_config is None or config_path is not None:
-        _global_config = Config(config_path)
+        with _global_lock:
+            if _global_config is None or config_path is not None:
+                _global_config = Config(config_path)
     
     return _global_config
@@ -3,16 +3,35 @@ GitHub連携モジュール
 Issue作成、HTMLレポートのアップロード機能
 """
 
-import requests
-from typing import Optional, Dict
-from datetime import datetime
-import base64
-import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Optional, Dict, List, Tuple
+import heapq
+import time
+
+# requests（urllib3等も読み込む）はGitHubManagerの生成時まで、base64/tracebackは使うメソッドまでimportを遅らせる
+if TYPE_CHECKING:
+    import requests
+
+# 高速JSONシリアライザー（未インストール時はrequestsの標準jsonを使用）
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 class GitHubManager:
     """GitHub連携クラス"""
     
+    # 並行して送るGETリクエストの上限（更新系のPUT/POSTは常に1件ずつ送る）
+    MAX_CONCURRENT_REQUESTS = 5
+    # レート制限に達したときのリトライ回数と、待機する最大秒数（これより長い待ちはせずに失敗させる）
+    MAX_RETRIES = 3
+    MAX_RATE_LIMIT_WAIT = 60
+    # 一時的なエラーとして指数バックオフで再送するステータスとメソッド
+    # POST（Issue作成）は重複作成を避けるためリトライしない
+    RETRY_STATUSES = (502, 503, 504)
+    RETRY_METHODS = ('GET', 'PUT')
+    
     def __init__(self, token: str, config):
         self.token = token
         self.config = config
@@ -21,19 +40,155 @@ class GitHubManager:
         self.reports_folder = config.get('github.reports_folder', 'reports')
         self.auto_create_issue = config.get('github.auto_create_issue_on_error', True)
         self.base_url = "https://api.github.com"
+        # トークン・オーナー・リポジトリが揃っていなければAPIを呼ばずに失敗を返す（404の往復を省く）
+        self._configured = bool(token and self.owner and self.repo)
         self.headers = {"Authorization": f"token {token}", "Accept": "application/vnd.github.v3+json"}
+        # 接続を使い回すクライアント（TLSハンドシェイクは初回のみ）
+        self.session = self._create_http2_client()
+        self._http2 = self.session is not None
+        if not self._http2:
+            self.session = self._create_requests_session()
+        self._executor = ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_REQUESTS)
+        # アップロード済みファイルのSHA（キー: リポジトリ内のパス）。更新時のGETを省く
+        self._sha_cache: Dict[str, str] = {}
+    
+    def _create_http2_client(self):
+        """
+        HTTP/2のhttpxクライアントを作成
+        
+        並行リクエストも1つの接続に多重化される。httpx/h2が未インストールならNone
+        リネーム・移管されたリポジトリの301に対応するため、requestsと同じくリダイレクトを追う
+        
+        Returns:
+            httpx.Client（作成できなければNone）
+        """
+        try:
+            import httpx
+            transport = httpx.HTTPTransport(http2=True, retries=self.MAX_RETRIES)
+        except ImportError:
+            return None
+        return httpx.Client(headers=self.headers, timeout=10.0, transport=transport, follow_redirects=True)
+    
+    def _create_requests_session(self) -> 'requests.Session':
+        """
+        HTTP/1.1のrequestsセッションを作成（httpxが使えない場合）
+        
+        Returns:
+            接続プールを設定した requests.Session
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        session = requests.Session()
+        session.headers.update(self.headers)
+        # 接続エラーのみアダプターでリトライする（5xxは _request で扱う）
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=self.MAX_RETRIES))
+        return session
+    
+    def _rate_limit_wait(self, response: 'requests.Response') -> Optional[float]:
+        """
+        レート制限のレスポンスなら待機秒数を返す（レート制限でなければNone）
+        
+        Retry-After があればその秒数、X-RateLimit-Remaining が0なら X-RateLimit-Reset までの秒数
+        """
+        if response.status_code not in (403, 429):
+            return None
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                return None
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            reset = response.headers.get('X-RateLimit-Reset')
+            if reset is not None:
+                try:
+                    return max(float(reset) - time.time(), 0.0) + 1.0
+                except ValueError:
+                    return None
+        return None
+    
+    def _request(self, method: str, url: str, **kwargs) -> 'requests.Response':
+        """
+        レート制限を考慮してAPIリクエストを送信
+        
+        403/429でレート制限のヘッダーがあれば指定された時間だけ待ち、
+        GET/PUTの502/503/504は指数バックオフで待って再送する（合わせて最大 MAX_RETRIES 回）
+        
+        Args:
+            method: HTTPメソッド
+            url: URL
+            **kwargs: クライアント（httpx/requests）に渡す引数
+            
+        Returns:
+            最後に受け取ったレスポンス
+        """
+        # Base64のレポートを含む大きなボディはorjsonでシリアライズする（再送時も使い回す）
+        if orjson is not None and 'json' in kwargs:
+            # httpxでは生のバイト列は content で渡す
+            kwargs['content' if self._http2 else 'data'] = orjson.dumps(kwargs.pop('json'))
+            kwargs['headers'] = {**kwargs.get('headers', {}), 'Content-Type': 'application/json'}
+        response = self.session.request(method, url, **kwargs)
+        for attempt in range(self.MAX_RETRIES):
+            if response.status_code in self.RETRY_STATUSES and method in self.RETRY_METHODS:
+                wait = 0.5 * 2 ** attempt
+                print(f"⏳ GitHub returned {response.status_code}, retrying in {wait:.1f}s...")
+            else:
+                wait = self._rate_limit_wait(response)
+                if wait is None or wait > self.MAX_RATE_LIMIT_WAIT:
+                    break
+                print(f"⏳ GitHub rate limit reached, retrying in {wait:.0f}s...")
+            time.sleep(wait)
+            response = self.session.request(method, url, **kwargs)
+        return response
+    
+    @staticmethod
+    def _json(response: 'requests.Response') -> Any:
+        """レスポンスのJSONをパース（orjsonがあれば使う）"""
+        if orjson is not None:
+            return orjson.loads(response.content)
+        return response.json()
+    
+    def _get_json(self, url: str) -> Optional[Any]:
+        """GETしてJSONを返す（失敗時はNone）"""
+        try:
+            response = self._request("GET", url)
+            response.raise_for_status()
+            return self._json(response)
+        except Exception as e:
+            print(f"❌ GET {url} failed: {e}")
+            return None
+    
+    def batch_get(self, urls: List[str]) -> List[Optional[Any]]:
+        """
+        互いに独立したGETリクエストを並行して実行
+        
+        同時実行数は MAX_CONCURRENT_REQUESTS まで。更新系のリクエストには使わない
+        
+        Args:
+            urls: 取得するURLのリスト
+            
+        Returns:
+            urls と同じ順序のレスポンスJSONのリスト（失敗したものはNone）
+        """
+        if not self._configured:
+            return [None] * len(urls)
+        return list(self._executor.map(self._get_json, urls))
     
     def create_issue(self, title: str, body: str, labels: list = None) -> Optional[str]:
         """GitHub Issueを作成"""
         if not self.token:
             print("⚠️  GITHUB_TOKEN not set, skipping issue creation")
             return None
+        if not self._configured:
+            print("⚠️  GitHub owner/repo not set, skipping issue creation")
+            return None
         url = f"{self.base_url}/repos/{self.owner}/{self.repo}/issues"
         data = {"title": title, "body": body, "labels": labels or ["bug", "auto-generated"]}
         try:
-            response = requests.post(url, headers=self.headers, json=data)
+            response = self._request("POST", url, json=data)
             response.raise_for_status()
-            issue_url = response.json().get('html_url')
+            issue_url = self._json(response).get('html_url')
             print(f"✅ GitHub Issue created: {issue_url}")
             return issue_url
         except Exception as e:
@@ -45,53 +200,86 @@ class GitHubManager:
         if not self.token:
             print("⚠️  GITHUB_TOKEN not set, skipping report upload")
             return None
+        if not self._configured:
+            print("⚠️  GitHub owner/repo not set, skipping report upload")
+            return None
         if filename is None:
-            timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+            timestamp = time.strftime('%Y-%m-%d_%H-%M-%S')
             filename = f"{timestamp}_analysis_report.html"
         file_path = f"{self.reports_folder}/{filename}"
-        content_bytes = html_content.encode('utf-8')
-        content_base64 = base64.b64encode(content_bytes).decode('utf-8')
+        import base64
+        
+        # UTF-8のバイト列は変数に残さずエンコード後すぐ解放する（Base64はASCIIのみ）
+        content_base64 = base64.b64encode(html_content.encode('utf-8')).decode('ascii')
+        # 以前アップロードしたファイルはSHAが分かっているので、作成を試さずに更新する
+        if file_path in self._sha_cache:
+            return self._update_existing_report(file_path, content_base64)
         url = f"{self.base_url}/repos/{self.owner}/{self.repo}/contents/{file_path}"
         data = {"message": f"add: Analysis report {filename}", "content": content_base64, "branch": "main"}
+        response = None
         try:
-            response = requests.put(url, headers=self.headers, json=data)
+            response = self._request("PUT", url, json=data)
             response.raise_for_status()
-            file_url = response.json()['content']['html_url']
+            content = self._json(response)['content']
+            self._sha_cache[file_path] = content['sha']
+            file_url = content['html_url']
             print(f"✅ Report uploaded: {file_url}")
             return file_url
         except Exception as e:
             print(f"❌ Failed to upload report: {e}")
-            if hasattr(response, 'status_code') and response.status_code == 422:
+            if response is not None and response.status_code in (409, 422):
                 print("   File already exists, trying to update...")
-                return self._update_existing_report(file_path, html_content)
+                return self._update_existing_report(file_path, content_base64)
             return None
     
-    def _update_existing_report(self, file_path: str, html_content: str) -> Optional[str]:
-        """既存のレポートを更新"""
+    def _update_existing_report(self, file_path: str, content_base64: str) -> Optional[str]:
+        """
+        既存のレポートを更新
+        
+        SHAがキャッシュにあればそのまま更新し、なければGETで取得する。
+        キャッシュのSHAが古く更新に失敗した場合は、取得し直して1回だけ再試行する
+        
+        Args:
+            file_path: リポジトリ内のパス
+            content_base64: Base64エンコード済みのレポート
+            
+        Returns:
+            更新したファイルのURL（失敗時はNone）
+        """
+        url = f"{self.base_url}/repos/{self.owner}/{self.repo}/contents/{file_path}"
         try:
-            url = f"{self.base_url}/repos/{self.owner}/{self.repo}/contents/{file_path}"
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            sha = response.json()['sha']
-            content_bytes = html_content.encode('utf-8')
-            content_base64 = base64.b64encode(content_bytes).decode('utf-8')
-            data = {"message": f"update: Analysis report {file_path}", "content": content_base64, "sha": sha, "branch": "main"}
-            response = requests.put(url, headers=self.headers, json=data)
-            response.raise_for_status()
-            file_url = response.json()['content']['html_url']
-            print(f"✅ Report updated: {file_url}")
-            return file_url
+            for _ in range(2):
+                sha = self._sha_cache.pop(file_path, None)
+                cached = sha is not None
+                if not cached:
+                    response = self._request("GET", url)
+                    response.raise_for_status()
+                    sha = self._json(response)['sha']
+                data = {"message": f"update: Analysis report {file_path}", "content": content_base64, "sha": sha, "branch": "main"}
+                response = self._request("PUT", url, json=data)
+                if cached and response.status_code in (409, 422):
+                    continue
+                response.raise_for_status()
+                content = self._json(response)['content']
+                self._sha_cache[file_path] = content['sha']
+                file_url = content['html_url']
+                print(f"✅ Report updated: {file_url}")
+                return file_url
         except Exception as e:
             print(f"❌ Failed to update report: {e}")
             return None
     
     def create_error_issue(self, error: Exception, context: Dict = None) -> Optional[str]:
         """エラー発生時にIssueを自動作成"""
-        if not self.auto_create_issue:
+        if not self.auto_create_issue or not self._configured:
             return None
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
         title = f"[Auto] Error - {type(error).__name__} - {timestamp}"
+        import traceback
         error_trace = traceback.format_exc()
+        context_section = ""
+        if context:
+            context_section = "**コンテキスト情報**:\n" + "".join(f"- {key}: `{value}`\n" for key, value in context.items())
         body = f"""## 🚨 エラーが発生しました
 
 **発生日時**: {timestamp}
@@ -106,12 +294,7 @@ class GitHubManager:
 ```
 
 ### 実行環境
-"""
-        if context:
-            body += "**コンテキスト情報**:\n"
-            for key, value in context.items():
-                body += f"- {key}: `{value}`\n"
-        body += """
+{context_section}
 ### 対応方法
 1. エラーメッセージとトレースバックを確認
 2. 入力データの形式を確認
@@ -128,9 +311,12 @@ ClaudeがこのエラーをGitHub MCPで分析し、修正PRを作成します
     
     def check_repository_access(self) -> bool:
         """リポジトリへのアクセス権限を確認"""
+        if not self._configured:
+            print("❌ Cannot access repository: GitHub token/owner/repo not set")
+            return False
         url = f"{self.base_url}/repos/{self.owner}/{self.repo}"
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request("GET", url)
             response.raise_for_status()
             print(f"✅ Repository access confirmed: {self.owner}/{self.repo}")
             return True
@@ -138,16 +324,75 @@ ClaudeがこのエラーをGitHub MCPで分析し、修正PRを作成します
             print(f"❌ Cannot access repository: {e}")
             return False
     
+    def _reports_tree_url(self) -> str:
+        """レポートフォルダのツリー（Git Trees API）のURL"""
+        return f"{self.base_url}/repos/{self.owner}/{self.repo}/git/trees/main:{self.reports_folder}"
+    
+    def _latest_html_files(self, tree: dict, limit: int) -> list:
+        """
+        Git Trees APIの結果からHTMLファイルを新しい順に limit 件取り出す
+        
+        ファイル名がタイムスタンプで始まるため名前の降順で新しい順になる。
+        contents APIと同じキー（name, path, sha, size, html_url, download_url）で返す
+        
+        Args:
+            tree: レポートフォルダのツリー
+            limit: 返す最大数
+            
+        Returns:
+            ファイル情報のリスト
+        """
+        entries = [e for e in tree.get('tree', []) if e['type'] == 'blob' and e['path'].endswith('.html')]
+        latest = heapq.nlargest(limit, entries, key=lambda e: e['path'])
+        return [
+            {
+                "name": e['path'],
+                "path": f"{self.reports_folder}/{e['path']}",
+                "sha": e['sha'],
+                "size": e.get('size'),
+                "type": "file",
+                "html_url": f"https://github.com/{self.owner}/{self.repo}/blob/main/{self.reports_folder}/{e['path']}",
+                "download_url": f"https://raw.githubusercontent.com/{self.owner}/{self.repo}/main/{self.reports_folder}/{e['path']}",
+            }
+            for e in latest
+        ]
+    
     def list_reports(self, limit: int = 10) -> list:
-        """アップロード済みレポートのリストを取得"""
-        url = f"{self.base_url}/repos/{self.owner}/{self.repo}/contents/{self.reports_folder}"
+        """
+        アップロード済みレポートのリストを取得
+        
+        contents APIはディレクトリをページ分割できず全エントリを詳細付きで返すため、
+        エントリが軽いGit Trees APIでフォルダを取得し、上位 limit 件だけを組み立てる
+        """
+        if not self._configured:
+            return []
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request("GET", self._reports_tree_url())
             response.raise_for_status()
-            files = response.json()
-            html_files = [f for f in files if f['name'].endswith('.html')]
-            html_files.sort(key=lambda x: x['name'], reverse=True)
-            return html_files[:limit]
+            return self._latest_html_files(self._json(response), limit)
         except Exception as e:
             print(f"❌ Failed to list reports: {e}")
             return []
+    
+    def check_access_and_list_reports(self, limit: int = 10) -> Tuple[bool, list]:
+        """
+        リポジトリへのアクセス確認とレポート一覧の取得を並行して実行
+        
+        Args:
+            limit: 返すレポートの最大数
+            
+        Returns:
+            (アクセス可能かどうか, レポートのリスト)
+        """
+        if not self._configured:
+            print("❌ Cannot access repository: GitHub token/owner/repo not set")
+            return False, []
+        repo_url = f"{self.base_url}/repos/{self.owner}/{self.repo}"
+        repo, tree = self.batch_get([repo_url, self._reports_tree_url()])
+        if repo is None:
+            print(f"❌ Cannot access repository: {self.owner}/{self.repo}")
+            return False, []
+        print(f"✅ Repository access confirmed: {self.owner}/{self.repo}")
+        if tree is None:
+            return True, []
+        return True, self._latest_html_files(tree, limit)